@@ -0,0 +1,163 @@
+"""Offline benchmarks for roboLog.py on the in-memory fake_sheets backend.
+
+    python benchmark.py                       # 1k, 10k and 100k-row logs
+    python benchmark.py --rows 1000 --latency-ms 40
+
+For every log size this reports the wall time and the number of API calls of
+the sheet helpers (run inside the app script, with cold and warm caches) and
+of every page of the app (first visit with empty caches, then a rerun).
+No credentials or network access are needed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "roboLog.py")
+PAGES = ["Home", "Add Robot", "Deploy Robot", "Add Maintenance",
+         "View Robot Log", "View Client Log", "View Maintenance Log", "Diagnostics"]
+
+# Appended to roboLog.py and run as part of the app, so the helpers see the
+# real session and caches. Results end up in st.session_state["benchmark"].
+HELPER_BENCHMARK = '''
+
+# ---------------- benchmark ----------------
+def _benchmark():
+    results = []
+
+    def measure(name, fn, cold):
+        if cold:
+            invalidate_sheets()  # also forces the robot index to rebuild
+        calls = len(sheet.client.calls)
+        start = time.perf_counter()
+        fn()
+        results.append({
+            "helper": name,
+            "cache": "cold" if cold else "warm",
+            "seconds": time.perf_counter() - start,
+            "api_calls": len(sheet.client.calls) - calls,
+        })
+
+    class _Upload(io.BytesIO):
+        name = "robots.csv"
+
+    def import_ten():
+        rows = "\\n".join(f"BENCH{time.time_ns()}{i},02:00:00:00:{i:02X}:{time.time_ns() % 256:02X}" for i in range(10))
+        upload = _Upload(("Serial Number,MAC Address\\n" + rows).encode())
+        types = [r["Robot Type"] for r in fetch_all_cached("Robot Model")]
+        import_robots(iter_import_rows(upload), types[0], 12, date.today(), types)
+
+    idle = [r["Serial Number"] for r in fetch_all_cached("Robot Log") if r["Status"] == "Idle"]
+    # deploy_robots runs twice (cold, warm); each run deploys three other idle robots
+    deploy_batches = iter([idle[2:5], idle[5:8]])
+    maintenance = "Maintenance and troubleshooting log"
+    helpers = [
+        ("fetch_all_cached(Robot Log)", lambda: fetch_all_cached("Robot Log")),
+        ("prefetch_sheets(all)", lambda: prefetch_sheets("Robot Log", "Client Log", maintenance, "Robot Model")),
+        ("robot_index", lambda: robot_index()),
+        ("find_robot", lambda: find_robot(idle[0])),
+        ("check_mac_exists", lambda: check_mac_exists("FF:FF:FF:FF:FF:FF")),
+        ("update_robot", lambda: update_robot(idle[1], {"Cloud Store Group": "Benchmark"})),
+        ("append_row_by_header(Maintenance)", lambda: append_row_by_header(maintenance, {
+            "Date of Issue": "2024-01-01", "Serial Number": idle[1], "Problem details": "benchmark", "Status": "Open"})),
+        ("deploy_robots(3)", lambda: deploy_robots(next(deploy_batches), "Benchmark Cafe", "KL", "", "Leasing")),
+        ("import_robots(10)", import_ten),
+        ("home_dashboard", lambda: home_dashboard()),
+        ("filter_frame(Robot Log)", lambda: filter_frame("Robot Log", sheet_frame("Robot Log"),
+            [("Status", ["Idle", "Active"])], ("Serial Number",), "sn00")),
+        ("search_sheet(Maintenance)", lambda: search_sheet(maintenance, "battery charging")),
+    ]
+    for name, fn in helpers:
+        measure(name, fn, cold=True)
+        measure(name, fn, cold=False)
+    st.session_state["benchmark"] = results
+
+_benchmark()
+'''
+
+
+def run_helpers(source):
+    at = AppTest.from_string(source + HELPER_BENCHMARK, default_timeout=3600)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at.session_state["benchmark"]
+
+
+def run_pages():
+    results = []
+    for page in PAGES:
+        st.cache_resource.clear()
+        at = AppTest.from_file(APP, default_timeout=3600)
+        at.run()
+        for cache in ("cold", "warm"):
+            if cache == "cold":
+                # Start the page from empty caches, including a fresh connection
+                st.cache_resource.clear()
+                calls_before = 0
+            import fake_sheets
+            start = time.perf_counter()
+            if cache == "cold":
+                at.sidebar.selectbox[0].select(page).run()
+            else:
+                calls_before = len(fake_sheets.last_spreadsheet.client.calls)
+                at.run()
+            seconds = time.perf_counter() - start
+            if at.exception:
+                raise RuntimeError(f"{page}: {at.exception[0].message}")
+            results.append({
+                "page": page,
+                "cache": cache,
+                "seconds": seconds,
+                "api_calls": len(fake_sheets.last_spreadsheet.client.calls) - calls_before,
+            })
+    return results
+
+
+def print_table(title, rows, key):
+    print(f"\n{title}")
+    print(f"  {key:<36} {'cache':<6} {'seconds':>9} {'API calls':>10}")
+    for row in rows:
+        print(f"  {row[key]:<36} {row['cache']:<6} {row['seconds']:>9.3f} {row['api_calls']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="data rows per synthetic log (default: 1000 10000 100000)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated latency per API request")
+    parser.add_argument("--quota", type=int, default=None, help="fake per-minute read/write quota (default: none)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, HERE)  # AppTest doesn't put the app's directory on sys.path
+    os.environ["ROBOLOG_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    if args.quota:
+        os.environ["ROBOLOG_FAKE_QUOTA"] = str(args.quota)
+    with open(APP, encoding="utf-8") as f:
+        source = f.read()
+
+    report = {}
+    for rows in args.rows:
+        os.environ["ROBOLOG_FAKE_SHEETS"] = str(rows)
+        print(f"\n=== {rows:,} rows per log ===")
+        st.cache_resource.clear()
+        helpers = run_helpers(source)
+        print_table("Helpers", helpers, "helper")
+        pages = run_pages()
+        print_table("Pages", pages, "page")
+        report[rows] = {"helpers": helpers, "pages": pages}
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
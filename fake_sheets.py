@@ -0,0 +1,360 @@
+"""In-memory stand-in for the gspread Spreadsheet/Worksheet objects roboLog.py uses.
+
+Every operation goes through FakeClient.request, just like gspread's own
+calls go through Client.request, so the request counting, quota scheduling
+and instrumentation wrappers in roboLog.py see the same traffic they would
+against Google Sheets. The client can add latency per request and enforce
+per-minute read/write quotas, answering 429 like the real API.
+
+roboLog.py uses this backend instead of SHEET_ID when ROBOLOG_FAKE_SHEETS is
+set (to the number of rows per synthetic log, e.g. ROBOLOG_FAKE_SHEETS=10000).
+ROBOLOG_FAKE_LATENCY_MS and ROBOLOG_FAKE_QUOTA set the latency and the
+per-minute read/write quota.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+
+import gspread
+from gspread.urls import (
+    DRIVE_FILES_API_V3_URL,
+    SPREADSHEET_URL,
+    SPREADSHEET_VALUES_APPEND_URL,
+    SPREADSHEET_VALUES_BATCH_UPDATE_URL,
+    SPREADSHEET_VALUES_BATCH_URL,
+    SPREADSHEET_VALUES_URL,
+    SPREADSHEET_BATCH_UPDATE_URL,
+)
+from gspread.utils import a1_to_rowcol, fill_gaps, numericise_all, quote, rowcol_to_a1
+
+FAKE_SPREADSHEET_ID = "fake-spreadsheet"
+
+ROBOT_LOG_HEADERS = [
+    "Robot Model", "Serial Number", "MAC Address", "Cloud Activation Period (Months)",
+    "Cloud Activation Date", "Cloud Expiry", "Cloud Store Group", "Maintenance Plan",
+    "Outlet using", "Status",
+]
+CLIENT_LOG_HEADERS = [
+    "Client Name", "Location", "Date of deployment", "Deplyoment Type", "Deployment Status",
+    "Maintance Package", "Cloud Store Group", "Robot Deployed", "Serial Number", "MAC Address",
+]
+MAINTENANCE_LOG_HEADERS = [
+    "Date of Issue", "Client Name", "Location of Robot", "Robot Model", "Serial Number",
+    "MAC Address", "Problem details", "Solution", "Remarks", "Status",
+]
+ROBOT_TYPES = ["Delivery Robot", "Cleaning Robot", "Reception Robot", "Disinfection Robot"]
+PROBLEMS = ["wheel stuck", "battery not charging", "lidar error", "wifi disconnects",
+            "motor noise", "screen frozen", "map lost", "docking failed"]
+SOLUTIONS = ["cleaned wheel", "replaced battery", "recalibrated lidar", "reset network settings",
+             "replaced motor", "firmware update", "remapped floor", "adjusted dock"]
+
+
+class FakeResponse:
+    """Just enough of requests.Response for gspread's APIError and the call log."""
+
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.body = body if body is not None else {}
+        self.content = json.dumps(self.body).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return self.body
+
+
+class FakeClient:
+    """Applies latency and per-minute quotas, then runs the operation's handler."""
+
+    def __init__(self, latency_ms=0, reads_per_minute=None, writes_per_minute=None):
+        self.latency_ms = latency_ms
+        self.quota = {"read": reads_per_minute, "write": writes_per_minute}
+        self.lock = threading.Lock()
+        self.recent = {"read": deque(), "write": deque()}
+        self.calls = []
+        self.throttled = 0
+
+    def request(self, method, endpoint, params=None, data=None, json=None, files=None, headers=None, handler=None):
+        kind = "read" if method.lower() == "get" else "write"
+        with self.lock:
+            now = time.monotonic()
+            recent = self.recent[kind]
+            while recent and now - recent[0] > 60:
+                recent.popleft()
+            self.calls.append((method.upper(), endpoint))
+            limit = self.quota[kind]
+            if limit is not None and len(recent) >= limit:
+                self.throttled += 1
+                raise gspread.exceptions.APIError(FakeResponse(429, {"error": {
+                    "code": 429,
+                    "message": f"Quota exceeded for quota metric '{kind.title()} requests' (RATE_LIMIT_EXCEEDED)",
+                    "status": "RESOURCE_EXHAUSTED",
+                }}))
+            recent.append(now)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return FakeResponse(200, handler() if handler else {})
+
+    def reset_counts(self):
+        with self.lock:
+            self.calls = []
+            self.throttled = 0
+
+
+def _trim(rows):
+    """Drop trailing empty cells and rows, the way the values API returns ranges."""
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = title
+        self.id = sheet_id
+        self.rows = [[_cell_text(v) for v in row] for row in rows]
+        self.col_count = max(26, max((len(r) for r in self.rows), default=0))
+
+    def __repr__(self):
+        return f"<FakeWorksheet {self.title!r} id:{self.id}>"
+
+    @property
+    def row_count(self):
+        return max(1000, len(self.rows))
+
+    def _range_url(self, a1=None):
+        # Quoted like gspread's own values_* calls, so the call log names them the same way
+        name = f"'{self.title}'" + (f"!{a1}" if a1 else "")
+        return SPREADSHEET_VALUES_URL % (self.spreadsheet.id, quote(name))
+
+    def _read(self, a1, handler):
+        return self.client.request("get", self._range_url(a1), handler=handler).body
+
+    def _write(self, url, payload, handler):
+        def apply():
+            # Only writes that got past the quota change the file's modifiedTime
+            result = handler()
+            self.spreadsheet.touch()
+            return result
+
+        return self.client.request("post", url, json=payload, handler=apply).body
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        while len(cells) < col:
+            cells.append("")
+        cells[col - 1] = _cell_text(value)
+        self.col_count = max(self.col_count, col)
+
+    def read_range(self, a1=None):
+        """Trimmed values of an A1 range on this worksheet (the whole sheet if a1 is None)."""
+        if not a1:
+            return _trim(self.rows)
+        match = re.fullmatch(r"([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?", a1.upper())
+        if match is None:
+            raise ValueError(f"Unsupported range {a1!r}")
+        c1, r1, c2, r2 = match.groups()
+        if match.group(0).find(":") < 0:
+            c2, r2 = c1, r1
+        first_col = a1_to_rowcol(f"{c1}1")[1] if c1 else 1
+        last_col = a1_to_rowcol(f"{c2}1")[1] if c2 else self.col_count
+        first_row = int(r1) if r1 else 1
+        last_row = int(r2) if r2 else len(self.rows)
+        return _trim(row[first_col - 1:last_col] for row in self.rows[first_row - 1:last_row])
+
+    def get_all_values(self, **kwargs):
+        values = self._read(None, lambda: {"values": self.read_range()}).get("values", [])
+        return fill_gaps(values) if values else []
+
+    def get_values(self, range_name=None, **kwargs):
+        values = self._read(range_name, lambda: {"values": self.read_range(range_name)}).get("values", [])
+        return fill_gaps(values) if values else []
+
+    def get_all_records(self, head=1, **kwargs):
+        values = self.get_all_values()
+        if len(values) < head:
+            return []
+        headers = values[head - 1]
+        return [dict(zip(headers, numericise_all(row))) for row in values[head:]]
+
+    def row_values(self, row, **kwargs):
+        values = self._read(f"{row}:{row}", lambda: {"values": self.read_range(f"{row}:{row}")}).get("values", [])
+        return values[0] if values else []
+
+    def update_cell(self, row, col, value):
+        a1 = rowcol_to_a1(row, col)
+        self._write(self._range_url(a1), {"values": [[value]]}, lambda: self._set(row, col, value) or {"updatedCells": 1})
+
+    def batch_update(self, data, **kwargs):
+        def apply():
+            for item in data:
+                start = item["range"].split("!")[-1].split(":")[0]
+                row, col = a1_to_rowcol(start)
+                for i, values in enumerate(item["values"]):
+                    for j, value in enumerate(values):
+                        self._set(row + i, col + j, value)
+            return {"totalUpdatedRows": sum(len(item["values"]) for item in data)}
+
+        return self._write(SPREADSHEET_VALUES_BATCH_UPDATE_URL % self.spreadsheet.id, {"data": data}, apply)
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values, **kwargs):
+        def apply():
+            del self.rows[len(_trim(self.rows)):]
+            start = len(self.rows) + 1
+            for row in values:
+                self.rows.append([_cell_text(v) for v in row])
+            width = max(len(row) for row in values) if values else 1
+            end = len(self.rows)
+            return {"updates": {
+                "updatedRange": f"'{self.title}'!A{start}:{rowcol_to_a1(end, width)}",
+                "updatedRows": len(values),
+            }}
+
+        url = SPREADSHEET_VALUES_APPEND_URL % (self.spreadsheet.id, quote(f"'{self.title}'"))
+        return self._write(url, {"values": values}, apply)
+
+    def delete_rows(self, start_index, end_index=None):
+        def apply():
+            del self.rows[start_index - 1:end_index or start_index]
+            return {"replies": [{}]}
+
+        return self._write(SPREADSHEET_BATCH_UPDATE_URL % self.spreadsheet.id, {"requests": [{"deleteDimension": {
+            "range": {"sheetId": self.id, "dimension": "ROWS", "startIndex": start_index - 1,
+                      "endIndex": end_index or start_index}}}]}, apply)
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheets, client=None):
+        self.id = FAKE_SPREADSHEET_ID
+        self.title = "Robot Deployment (fake)"
+        self.client = client or FakeClient()
+        self.modified = 0
+        self._worksheets = [FakeWorksheet(self, title, rows, i) for i, (title, rows) in enumerate(sheets.items())]
+
+    def touch(self):
+        self.modified += 1
+
+    def _worksheet(self, title):
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise gspread.exceptions.WorksheetNotFound(title)
+
+    def worksheets(self):
+        self.client.request("get", SPREADSHEET_URL % self.id)
+        return list(self._worksheets)
+
+    def worksheet(self, title):
+        self.client.request("get", SPREADSHEET_URL % self.id)
+        return self._worksheet(title)
+
+    def _read_range(self, range_name):
+        title, _, a1 = range_name.partition("!")
+        title = title[1:-1].replace("''", "'") if title.startswith("'") else title
+        values = self._worksheet(title).read_range(a1 or None)
+        value_range = {"range": range_name, "majorDimension": "ROWS"}
+        if values:
+            value_range["values"] = values
+        return value_range
+
+    def values_get(self, range_name, params=None):
+        return self.client.request("get", SPREADSHEET_VALUES_URL % (self.id, quote(range_name)),
+                                   handler=lambda: self._read_range(range_name)).body
+
+    def values_batch_get(self, ranges, params=None):
+        return self.client.request("get", SPREADSHEET_VALUES_BATCH_URL % self.id, params={"ranges": ranges},
+                                   handler=lambda: {"spreadsheetId": self.id,
+                                                    "valueRanges": [self._read_range(r) for r in ranges]}).body
+
+    def get_lastUpdateTime(self):
+        body = self.client.request("get", f"{DRIVE_FILES_API_V3_URL}/{self.id}",
+                                   handler=lambda: {"modifiedTime": f"fake-revision-{self.modified}"}).body
+        return body["modifiedTime"]
+
+
+def synthetic_workbook(rows=1000, seed=0):
+    """Robot Log, Client Log and Maintenance log grids with `rows` data rows each, plus Robot Model."""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    robots = [ROBOT_LOG_HEADERS]
+    clients = [CLIENT_LOG_HEADERS]
+    maintenance = [MAINTENANCE_LOG_HEADERS]
+    for i in range(rows):
+        model = ROBOT_TYPES[i % len(ROBOT_TYPES)]
+        serial = f"SN{i:07d}"
+        mac = ":".join(f"{b:02X}" for b in (i >> 40 & 255, i >> 32 & 255, i >> 24 & 255, i >> 16 & 255, i >> 8 & 255, i & 255))
+        activated = start + timedelta(days=rng.randrange(600))
+        client = f"Outlet {rng.randrange(max(1, rows // 10)):05d}"
+        deployed = i % 3 != 0
+        robots.append([
+            model, serial, mac, "12", activated.isoformat(), (activated + timedelta(days=360)).isoformat(),
+            f"Group {i % 20}", "Leasing" if deployed else "", client if deployed else "",
+            "Active" if deployed else rng.choice(["Idle", "Idle", "Maintenance", "Retired"]),
+        ])
+        clients.append([
+            client, rng.choice(["Kuala Lumpur", "Penang", "Johor Bahru", "Ipoh"]), activated.isoformat(),
+            "Deployment", "Active" if deployed else "Inactive", rng.choice(["Purchased", "Leasing"]),
+            f"Group {i % 20}", model, serial, mac,
+        ])
+        problem = rng.randrange(len(PROBLEMS))
+        maintenance.append([
+            (activated + timedelta(days=rng.randrange(300))).isoformat(), client, "", model, serial, mac,
+            PROBLEMS[problem], SOLUTIONS[problem], "", rng.choice(["Open", "Closed", "Closed"]),
+        ])
+    return {
+        "Robot Log": robots,
+        "Client Log": clients,
+        "Maintenance and troubleshooting log": maintenance,
+        "Robot Model": [["Robot Type"]] + [[t] for t in ROBOT_TYPES],
+    }
+
+
+def connect(rows=1000, latency_ms=0, quota=None, seed=0):
+    """A FakeSpreadsheet filled with synthetic_workbook(rows); quota applies to reads and writes each."""
+    client = FakeClient(latency_ms=latency_ms, reads_per_minute=quota, writes_per_minute=quota)
+    spreadsheet = FakeSpreadsheet(synthetic_workbook(rows, seed), client)
+    global last_spreadsheet
+    last_spreadsheet = spreadsheet
+    return spreadsheet
+
+
+def connect_from_env():
+    """connect() configured by ROBOLOG_FAKE_SHEETS / _LATENCY_MS / _QUOTA, or None when unset."""
+    rows = os.environ.get("ROBOLOG_FAKE_SHEETS")
+    if not rows:
+        return None
+    quota = os.environ.get("ROBOLOG_FAKE_QUOTA")
+    return connect(
+        rows=int(rows),
+        latency_ms=float(os.environ.get("ROBOLOG_FAKE_LATENCY_MS", "0")),
+        quota=int(quota) if quota else None,
+    )
+
+
+last_spreadsheet = None
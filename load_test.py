@@ -0,0 +1,331 @@
+"""Concurrent-session load test for roboLog.py on the in-memory fake_sheets backend.
+
+    python load_test.py                                   # 1, 2, 4 and 8 sessions
+    python load_test.py --sessions 4 16 --latency-ms 80 --quota 60
+
+Every simulated operator is its own Streamlit session (an AppTest in its own
+thread) sharing the process-wide caches, like tabs on one server. All
+sessions take each step of the flow together:
+
+    Home -> Deploy Robot (open, submit) -> Add Maintenance (open, submit)
+         -> View Client Log (open, pick a deployment, retrieve)
+
+Each session deploys its own robot to its own client and then works on that
+robot and deployment, picked by label right before the save is submitted.
+For each level of concurrency this reports how many sessions completed and
+failed each step, the API calls per completed action, p50/p95/p99 rerun
+latency of the completed ones, 429 responses from the fake quota and how the
+sheet cache coped with the simultaneous loads (fetches vs coalesced waits).
+Saves that show an error or no confirmation count as failed and are listed
+below the table. Select widgets lose their value when their options change,
+so a save whose selection was reset by another session's save is prepared
+and submitted again, as an operator would, and counted under resubmits.
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+
+from unittest.mock import MagicMock
+
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "roboLog.py")
+
+
+def share_test_runtime():
+    """Let AppTest sessions run at the same time in one process.
+
+    Each AppTest run installs a mock Runtime and removes it when it finishes,
+    which breaks any other session that is still running, so one shared
+    runtime stays in place. Every run also compiles the script again, and
+    compile() on several threads at once can fail on Python 3.11.
+    """
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class StepFailed(Exception):
+    pass
+
+
+class LostSelection(StepFailed):
+    """A form's selection was reset: another session's save changed the widget's options."""
+
+
+def option(widget, text):
+    """The option of a select widget containing text; options shift as other sessions save."""
+    for value in widget.options:
+        if text in value:
+            return value
+    raise LookupError(f"no option with {text!r}")
+
+
+def confirm(at, text=None):
+    """Raise StepFailed unless the rerun showed no errors and a success message containing text."""
+    problems = [e.message for e in at.exception] + [e.value for e in at.error]
+    if problems:
+        raise StepFailed("; ".join(problems))
+    if text is not None and not any(text in s.value for s in at.success):
+        raise StepFailed("no confirmation shown")
+
+
+def flow(at, session):
+    """Steps of one operator as (name, prepare, trigger, check).
+
+    prepare (untimed, may be None) re-renders the page and fills the form, so
+    the labels picked match the options right before the submit. trigger
+    returns the AppTest whose run() is timed, and check raises StepFailed
+    unless the step did what it should.
+    """
+    client = f"Load Test Cafe {session}"
+    picked = {}
+
+    def fill_deploy():
+        if "serial" not in picked:
+            # Nobody has deployed yet, so all sessions see the same idle robots and each takes its own
+            picked["serial"] = at.main.multiselect[0].options[session].split(" - ")[0]
+        at.run()
+        at.main.text_input[0].input(client)
+        at.main.text_input[1].input("Kuala Lumpur")
+        at.main.text_input[2].input("Load Test")
+        at.main.multiselect[0].select(option(at.main.multiselect[0], f"{picked['serial']} - "))
+
+    def deployed():
+        if any("select at least one robot" in e.value for e in at.error):
+            raise LostSelection("robot selection reset by another session's deploy")
+        confirm(at, f"• {picked['serial']} (")
+
+    def fill_maintenance():
+        at.run()
+        at.main.selectbox[0].select(option(at.main.selectbox[0], f"{picked['serial']} - "))
+        at.main.text_area[0].input("Robot stops at the charging dock")
+        at.main.text_area[1].input("Cleaned the charging contacts")
+
+    def maintained():
+        if not at.main.selectbox[0].value.startswith(f"{picked['serial']} - "):
+            raise LostSelection("robot selection reset by another session's save; the record went to another robot")
+        confirm(at, "Maintenance record")
+
+    def pick_deployment():
+        deployments = at.main.selectbox(key="retrieve_select")
+        return deployments.select(option(deployments, f": {client} - {picked['serial']} "))
+
+    def fill_retrieve():
+        at.run()
+        pick_deployment().run()
+
+    def retrieved():
+        if not at.exception and not at.error and not at.success:
+            raise LostSelection("deployment selection reset by another session's retrieve")
+        confirm(at, f"Robot {picked['serial']} retrieved")
+
+    def submit(label):
+        return lambda: next(b for b in at.main.button if b.label == label).click()
+
+    def shown():
+        confirm(at)
+
+    return [
+        ("Home", None, lambda: at, shown),
+        ("Open Deploy Robot", None, lambda: at.sidebar.selectbox[0].select("Deploy Robot"), shown),
+        ("Deploy Robot", fill_deploy, submit("Deploy Robot(s)"), deployed),
+        ("Open Add Maintenance", None, lambda: at.sidebar.selectbox[0].select("Add Maintenance"), shown),
+        ("Add Maintenance", fill_maintenance, submit("Add Maintenance Record"), maintained),
+        ("Open View Client Log", None, lambda: at.sidebar.selectbox[0].select("View Client Log"), shown),
+        ("Pick deployment", None, pick_deployment, shown),
+        ("Retrieve Robot", fill_retrieve, lambda: next(b for b in at.main.button if "Retrieve Robot" in b.label).click(),
+         retrieved),
+    ]
+
+
+def run_level(sessions, timeout):
+    """Run every session through the flow in lockstep; returns per-step results and errors.
+
+    A save whose selection was reset by another session's save is prepared and
+    submitted again, as an operator would, up to sessions - 1 times; its
+    latency covers all of its submits.
+    """
+    import fake_sheets
+
+    st.cache_resource.clear()  # each level starts cold, on a fresh fake workbook
+    apps = [AppTest.from_file(APP, default_timeout=timeout) for _ in range(sessions)]
+    flows = [flow(at, i) for i, at in enumerate(apps)]
+    step_names = [name for name, _, _, _ in flows[0]]
+    latencies = {name: [] for name in step_names}
+    completed = {name: 0 for name in step_names}
+    retried = {name: 0 for name in step_names}
+    errors = []
+    counts = []
+    lock = threading.Lock()
+
+    def snapshot():
+        # Runs in one thread while the others wait at the barrier: before each step's
+        # preparation and again before its timed reruns
+        client = fake_sheets.last_spreadsheet.client if fake_sheets.last_spreadsheet else None
+        counts.append((len(client.calls), client.throttled) if client else (0, 0))
+
+    barrier = threading.Barrier(sessions, action=snapshot, timeout=timeout)
+
+    def operator(i):
+        for name, prepare, trigger, check in flows[i]:
+            barrier.wait()
+            problem, elapsed, retries = None, 0.0, 0
+            try:
+                if prepare:
+                    prepare()
+            except Exception as e:  # a widget the step needs was not rendered
+                problem = f"could not prepare the step ({type(e).__name__}: {e})"
+            barrier.wait()
+            while problem is None:
+                try:
+                    start = time.perf_counter()
+                    try:
+                        trigger().run()
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    check()
+                    break
+                except LostSelection as e:
+                    if retries == sessions - 1:
+                        problem = f"{e} ({retries} resubmits)"
+                        break
+                except StepFailed as e:
+                    problem = str(e)
+                    break
+                except Exception as e:
+                    problem = f"could not run the step ({type(e).__name__}: {e})"
+                    break
+                retries += 1
+                try:
+                    prepare()
+                except Exception as e:
+                    problem = f"could not prepare the step again ({type(e).__name__}: {e})"
+            with lock:
+                retried[name] += retries
+                if problem is None:
+                    completed[name] += 1
+                    latencies[name].append(elapsed)
+                else:
+                    errors.append(f"session {i}, {name}: {problem}")
+
+    threads = [threading.Thread(target=operator, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot()
+
+    steps = []
+    for k, name in enumerate(step_names):
+        # Timed reruns of step k run between snapshots 2k + 1 and 2k + 2; the fake
+        # client is created by the first run, so Home counts from zero
+        start, end = counts[2 * k + 1] if k else (0, 0), counts[2 * k + 2]
+        steps.append({
+            "step": name,
+            # Calls of the step's reruns, resubmits included, per completed action
+            "calls_per_action": (end[0] - start[0]) / max(1, completed[name]),
+            "completed": completed[name],
+            "failed": sessions - completed[name],
+            "retried": retried[name],
+            "throttled": end[1] - start[1],
+            "latencies": latencies[name],
+        })
+    return steps, errors, cache_stats(timeout)
+
+
+def cache_stats(timeout):
+    """Sheet-cache and quota counters as shown on the Diagnostics page."""
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    at.sidebar.selectbox[0].select("Diagnostics").run()
+    metrics = {m.label: m.value for m in at.metric}
+    details = at.dataframe[0].value.iloc[0]["Details"]
+    numbers = {key: int(value) for value, key in re.findall(r"(\d+) (served stale|fetches|coalesced|unchanged)", details)}
+    return {
+        "fetches": numbers.get("fetches", 0),
+        "coalesced": numbers.get("coalesced", 0),
+        "queued": int(metrics.get("Queued for quota", 0)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent sessions per level (default: 1 2 4 8)")
+    parser.add_argument("--rows", type=int, default=1000, help="data rows per synthetic log (default: 1000)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="simulated latency per API request (default: 50)")
+    parser.add_argument("--quota", type=int, default=None, help="fake per-minute read/write quota (default: none)")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds a single rerun may take")
+    args = parser.parse_args()
+
+    sys.path.insert(0, HERE)  # AppTest doesn't put the app's directory on sys.path
+    share_test_runtime()
+    os.environ["ROBOLOG_FAKE_SHEETS"] = str(args.rows)
+    os.environ["ROBOLOG_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    if args.quota:
+        os.environ["ROBOLOG_FAKE_QUOTA"] = str(args.quota)
+
+    summary = []
+    for sessions in args.sessions:
+        started = time.perf_counter()
+        steps, errors, stats = run_level(sessions, args.timeout)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n=== {sessions} concurrent session(s), {elapsed:.1f}s ===")
+        print(f"  {'step':<22} {'done':>5} {'failed':>6} {'resubmits':>9} {'calls/action':>12} {'429s':>5} "
+              f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7}")
+        for step in steps:
+            print(f"  {step['step']:<22} {step['completed']:>5} {step['failed']:>6} {step['retried']:>9} "
+                  f"{step['calls_per_action']:>12.1f} {step['throttled']:>5} "
+                  f"{percentile(step['latencies'], 50):>7.3f} {percentile(step['latencies'], 95):>7.3f} "
+                  f"{percentile(step['latencies'], 99):>7.3f}")
+        print(f"  sheet cache: {stats['fetches']} fetch(es), {stats['coalesced']} coalesced load(s); "
+              f"{stats['queued']} request(s) queued for quota")
+        for error in errors:
+            print(f"  ! {error}")
+
+        latencies = [t for step in steps for t in step["latencies"]]
+        summary.append((sessions, sum(s["calls_per_action"] for s in steps), sum(s["retried"] for s in steps),
+                        sum(s["throttled"] for s in steps),
+                        percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99),
+                        stats["fetches"], stats["coalesced"], sum(s["failed"] for s in steps)))
+
+    print("\n=== Summary ===")
+    print(f"  {'sessions':>8} {'calls/flow':>10} {'resubmits':>9} {'429s':>5} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'fetches':>8} {'coalesced':>9} {'failed':>6}")
+    for row in summary:
+        print("  {:>8} {:>10.1f} {:>9} {:>5} {:>7.3f} {:>7.3f} {:>7.3f} {:>8} {:>9} {:>6}".format(*row))
+
+
+if __name__ == "__main__":
+    main()
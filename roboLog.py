@@ -1,7 +1,25 @@
 import streamlit as st
 import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1, absolute_range_name, fill_gaps, numericise_all, ValueInputOption
 from google.oauth2.service_account import Credentials
-from datetime import datetime, timedelta
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from contextlib import contextmanager, nullcontext
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import cProfile
+import csv
+import functools
+import io
+import itertools
+import json
+import math
+import os
+import pstats
+import re
+import threading
+import time
+import zipfile
 import pandas as pd
 
 # ================= PAGE CONFIG =================
@@ -12,6 +30,174 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ================= PROFILER =================
+# Opt-in timings of every rerun, shown in the sidebar: add ?profile=1 to the URL or set
+# ROBOLOG_PROFILE=1. ROBOLOG_PROFILE=cprofile also writes a pstats dump of each rerun to
+# PROFILE_DIR (inspect with `python -m pstats <file>`); the URL can't turn that on, as it
+# writes files on the server. Only the newest PROFILE_KEEP dumps are kept.
+PROFILE_DIR = os.environ.get("ROBOLOG_PROFILE_DIR", "profiles")
+PROFILE_KEEP = 50
+
+# Timed on every call while profiling; nested helpers count in their callers' time too
+PROFILED_HELPERS = (
+    "get_worksheet", "sync_header_map", "append_row_by_header", "batch_update_rows",
+    "fetch_values_batch", "fetch_values_with_retry", "fetch_all_cached", "prefetch_sheets",
+    "confirm_cached_rows", "sheet_frame", "filter_frame", "sort_frame", "frame_page", "match_robots",
+    "home_dashboard", "search_sheet", "export_controls", "snapshot_controls", "robot_index",
+    "find_robot", "update_robot", "deploy_robots", "update_client_row", "check_mac_exists",
+    "delete_robot_row", "delete_client_row", "import_robots",
+)
+
+class RerunProfiler:
+    """Wall time of the script's sections and of helper calls during one rerun.
+
+    mark() ends the current section and starts the next, so the page blocks
+    don't need to be wrapped. Helpers are only timed on the script thread;
+    background refreshes running meanwhile are not part of the rerun.
+
+    Reruns cut short by st.rerun(), st.stop() or an exception never reach
+    finish(); start() closes such a profile at the beginning of the session's
+    next rerun, which shows it above its own.
+    """
+
+    def __init__(self, mode):
+        self.enabled = mode is not None
+        self.cprofile = cProfile.Profile() if mode == "cprofile" else None
+        self.cprofile_busy = False
+        self.thread = threading.get_ident()
+        self.sections = []  # [name, seconds] in script order
+        self.helpers = {}  # name -> [calls, seconds]
+        self.page = None
+        self.interrupted = None  # the session's previous profile, if that rerun ended early
+        self.closed = False
+        self.total = 0.0
+        self.dump_path = None
+        self.started = self.lap = time.perf_counter()
+
+    def start(self):
+        if not self.enabled:
+            return self
+        earlier = st.session_state.get("rerun_profiler")
+        if earlier is not None and not earlier.closed:
+            # Disabled before this rerun's cProfile is enabled: on Python 3.12+ only one can run
+            earlier.close()
+            self.interrupted = earlier
+        st.session_state["rerun_profiler"] = self
+        if self.cprofile:
+            try:
+                self.cprofile.enable()
+            except ValueError:  # Python 3.12+: another session's rerun is being profiled
+                self.cprofile, self.cprofile_busy = None, True
+        return self
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.sections:
+            self.sections[-1][1] = now - self.lap
+        self.sections.append([name, 0.0])
+        self.lap = now
+
+    def wrap(self, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            if threading.get_ident() != self.thread:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats = self.helpers.setdefault(fn.__name__, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.perf_counter() - start
+        return timed
+
+    def dump(self):
+        """Write the cProfile stats of this rerun to PROFILE_DIR and return the path."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        page = re.sub(r"\W+", "-", self.page or "app").strip("-").lower()
+        path = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{page}.pstats")
+        self.cprofile.dump_stats(path)
+        # Names start with the time, so the oldest dumps sort first
+        dumps = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".pstats"))
+        for name in dumps[:-PROFILE_KEEP]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name))
+            except OSError:  # already removed by another session
+                pass
+        return path
+
+    def close(self):
+        """End the last section and stop cProfile; later calls do nothing."""
+        if not self.enabled or self.closed:
+            return
+        self.closed = True
+        self.mark(None)
+        self.sections.pop()
+        self.total = self.lap - self.started
+        if self.cprofile:
+            self.cprofile.disable()
+            self.dump_path = self.dump()
+
+    def sections_frame(self, previous=None):
+        """Section timings; with `previous` ({name: seconds}) also the change since then."""
+        rows = []
+        for name, seconds in self.sections:
+            row = {"Section": name, "ms": round(seconds * 1000, 1),
+                   "Share": f"{seconds / self.total:.0%}" if self.total else "–"}
+            if previous is not None:
+                row["vs last (ms)"] = round((seconds - previous[name]) * 1000, 1) if name in previous else None
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def finish(self):
+        """Close this rerun's profile and show it in the sidebar."""
+        if not self.enabled:
+            return
+        self.close()
+
+        # Compared with the previous profiled rerun of the same page in this session
+        history = st.session_state.setdefault("rerun_profiles", {})
+        previous = history.get(self.page, {})
+        history[self.page] = {name: seconds for name, seconds in self.sections}
+
+        with st.sidebar.expander("⏱️ Rerun profile", expanded=True):
+            if self.interrupted:
+                earlier = self.interrupted
+                last = earlier.sections[-1][0] if earlier.sections else "start"
+                st.caption(f"The previous rerun of {earlier.page or 'the app'} ended early (st.rerun, st.stop "
+                           f"or an error) in {last}, after {earlier.total * 1000:.0f} ms")
+                st.dataframe(earlier.sections_frame(), use_container_width=True, hide_index=True)
+                if earlier.dump_path:
+                    st.caption(f"cProfile dump: {earlier.dump_path}")
+            st.caption(f"{self.total * 1000:.0f} ms for this rerun of {self.page}")
+            st.dataframe(self.sections_frame(previous), use_container_width=True, hide_index=True)
+            if self.helpers:
+                st.dataframe(pd.DataFrame([
+                    {"Helper": name, "Calls": calls, "ms": round(seconds * 1000, 1)}
+                    for name, (calls, seconds) in sorted(self.helpers.items(), key=lambda item: -item[1][1])
+                ]), use_container_width=True, hide_index=True)
+            if self.cprofile_busy:
+                st.caption("cProfile was not run: another session's rerun was being profiled")
+            if self.cprofile:
+                st.caption(f"cProfile dump: {self.dump_path}")
+                out = io.StringIO()
+                pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(10)
+                st.code(out.getvalue().strip(), language=None)
+
+def profile_mode():
+    """None, or the profiling mode asked for by ROBOLOG_PROFILE ("1", "cprofile") or ?profile=1."""
+    mode = os.environ.get("ROBOLOG_PROFILE", "").strip().lower()
+    if mode in ("", "0", "false", "off"):
+        # Visitors only get the timings; cProfile dumps are for whoever runs the server
+        mode = (st.query_params.get("profile") or "").strip().lower()
+        mode = None if mode in ("", "0", "false", "off") else "timings"
+    return mode
+
+profiler = RerunProfiler(profile_mode()).start()
+profiler.mark("theme")
+
 # ================= THEME TOGGLE =================
 # Initialize theme in session state
 if 'theme' not in st.session_state:
@@ -412,6 +598,7 @@ else:
     st.markdown(light_theme_css, unsafe_allow_html=True)
 
 # ================= CONFIG =================
+profiler.mark("setup")
 SERVICE_ACCOUNT_FILE = "credentials.json"
 
 SCOPES = [
@@ -421,16 +608,284 @@ SCOPES = [
 
 SHEET_ID = "1DpQkaLbjoF86CjwiJymPY3e7EHYH6Qh6dUL0o7IbDiQ"
 
+# Cached sheet data older than the soft limit is reloaded; with background refresh
+# on, it keeps being served while a background thread reloads it, up to the hard limit.
+SHEET_CACHE_BACKGROUND_REFRESH = True
+SHEET_CACHE_SOFT_TTL = 300  # seconds
+SHEET_CACHE_HARD_TTL = 1800  # seconds
+
+# Mostly append-only worksheets: when the change probe reports a change (or can't answer),
+# refreshes fetch only the listed columns and the rows added since the last load, and fall
+# back to a full download when those columns of the cached rows differ. The app's own edits
+# are patched into the cache; other edits elsewhere in older rows are picked up by a full
+# reload at least once per interval.
+TAIL_FETCH_SHEETS = {
+    "Maintenance and troubleshooting log": ("Serial Number", "Status"),
+    "Client Log": ("Serial Number", "Deployment Status"),
+}
+TAIL_FULL_RELOAD_INTERVAL = 3600  # seconds
+
+# Checked before refetching expired sheet data: "drive" (file modifiedTime), "sentinel"
+# (a cell range every writer updates, CHANGE_PROBE_SENTINEL_RANGE) or None to always refetch
+CHANGE_PROBE = "drive"
+CHANGE_PROBE_SENTINEL_RANGE = None
+
+# Sheets API per-minute quotas for the service account (reads and writes are counted separately)
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
 # ================= AUTH =================
+class TokenBucket:
+    """Per-minute request quota: `capacity` tokens, refilled evenly over 60 seconds.
+
+    take() always reserves a token; when none is left the balance goes
+    negative and the caller is told how long to wait for its turn, so
+    waiting callers are served in arrival order.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self):
+        """Reserve one token and return the seconds to wait before using it."""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def drain(self, backoff=0.0):
+        """Empty the bucket after the API answered 429 so every caller backs off.
+
+        The next token is only handed out `backoff` seconds after the bucket would
+        have refilled it.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - backoff * self.rate
+
+    def headroom(self):
+        with self.lock:
+            self._refill()
+            return max(0, int(self.tokens))
+
+class RequestScheduler:
+    """Process-wide read and write token buckets shared by every session.
+
+    reserved() lets a thread wait for the tokens of its next few requests up
+    front, before it takes a lock other sessions need; those requests then
+    go out without waiting again.
+    """
+
+    def __init__(self, reads_per_minute, writes_per_minute):
+        self.buckets = {"read": TokenBucket(reads_per_minute), "write": TokenBucket(writes_per_minute)}
+        self.lock = threading.Lock()
+        self.prepaid = threading.local()
+        self.strikes = {"read": 0, "write": 0}  # 429s in a row
+        self.deferred = 0
+        self.waited = 0.0
+
+    def _wait(self, wait):
+        if wait:
+            with self.lock:
+                self.deferred += 1
+                self.waited += wait
+            time.sleep(wait)
+
+    def acquire(self, kind):
+        credits = getattr(self.prepaid, "credits", {})
+        if credits.get(kind):
+            credits[kind] -= 1
+            return
+        self._wait(self.buckets[kind].take())
+
+    @contextmanager
+    def reserved(self, reads=0, writes=0):
+        """Take `reads` read and `writes` write tokens now for requests made inside the block.
+
+        Tokens the block doesn't use are not given back; requests beyond them
+        wait for quota as usual.
+        """
+        waits = [self.buckets[kind].take() for kind, count in (("read", reads), ("write", writes)) for _ in range(count)]
+        # Tokens are handed out in order, so the last one has the longest wait
+        self._wait(max(waits, default=0.0))
+        self.prepaid.credits = {"read": reads, "write": writes}
+        try:
+            yield
+        finally:
+            self.prepaid.credits = {}
+
+    def throttled(self, kind):
+        """Back off 2, 4, 8 ... seconds (at most a minute) for each 429 in a row."""
+        with self.lock:
+            self.strikes[kind] += 1
+            backoff = min(60, 2 ** self.strikes[kind])
+        self.buckets[kind].drain(backoff)
+
+    def succeeded(self, kind):
+        if self.strikes[kind]:
+            with self.lock:
+                self.strikes[kind] = 0
+
+    def headroom(self):
+        return {kind: (bucket.headroom(), bucket.capacity) for kind, bucket in self.buckets.items()}
+
+@st.cache_resource
+def get_request_scheduler():
+    return RequestScheduler(READ_REQUESTS_PER_MINUTE, WRITE_REQUESTS_PER_MINUTE)
+
+def schedule_requests(client, scheduler):
+    """Wrap client.request so every API call waits for a read or write token first."""
+    request = client.request
+
+    def scheduled_request(method, *args, **kwargs):
+        kind = "read" if method.lower() == "get" else "write"
+        scheduler.acquire(kind)
+        try:
+            response = request(method, *args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code == 429:
+                scheduler.throttled(kind)
+            raise
+        scheduler.succeeded(kind)
+        return response
+
+    client.request = scheduled_request
+    return client
+
+class ApiCallLog:
+    """Recent API calls with their latency, payload sizes, status and the
+    rerun, page and action that made them.
+
+    The script thread labels its calls through set_context(); calls from
+    background threads are labelled "background".
+    """
+
+    def __init__(self, max_calls=5000):
+        self.lock = threading.Lock()
+        self.calls = deque(maxlen=max_calls)
+        self.context = threading.local()
+        self.reruns = itertools.count(1)
+
+    def begin_rerun(self):
+        self.context.rerun = next(self.reruns)
+        self.context.page = None
+        self.context.action = None
+
+    def set_context(self, **labels):
+        for name, value in labels.items():
+            setattr(self.context, name, value)
+
+    def record(self, call):
+        call.update(
+            rerun=getattr(self.context, "rerun", None),
+            page=getattr(self.context, "page", None) or "background",
+            action=getattr(self.context, "action", None) or "",
+        )
+        with self.lock:
+            self.calls.append(call)
+
+    def frame(self):
+        with self.lock:
+            return pd.DataFrame(list(self.calls), columns=[
+                "time", "operation", "method", "status", "latency_ms", "request_bytes",
+                "response_bytes", "rerun", "page", "action", "thread"
+            ])
+
+    def clear(self):
+        with self.lock:
+            self.calls.clear()
+
+@st.cache_resource
+def get_api_log():
+    return ApiCallLog()
+
+def describe_endpoint(endpoint):
+    """Short operation name for a Sheets/Drive API URL, e.g. values.batchGet."""
+    path = str(endpoint).split("?", 1)[0]
+    if "/drive/" in path:
+        return "drive.files.get"
+    after = path.split("/spreadsheets/", 1)[-1]
+    spreadsheet, sep, rest = after.partition("/")
+    if not sep:
+        return "spreadsheets." + (spreadsheet.split(":", 1)[1] if ":" in spreadsheet else "get")
+    if rest.startswith("values:"):
+        return "values." + rest[len("values:"):]
+    if rest.startswith("values/"):
+        return "values." + (rest.rsplit(":", 1)[1] if ":" in rest else "get")
+    return rest
+
+def instrument_requests(client, log):
+    """Wrap client.request so every API call is recorded in the call log."""
+    request = client.request
+
+    def instrumented_request(method, endpoint, *args, **kwargs):
+        payload = kwargs.get("json") if kwargs.get("json") is not None else kwargs.get("data")
+        call = {
+            "time": time.time(),
+            "operation": describe_endpoint(endpoint),
+            "method": method.upper(),
+            "status": None,
+            "request_bytes": len(json.dumps(payload)) if isinstance(payload, (dict, list)) else len(payload or b""),
+            "response_bytes": 0,
+            "thread": threading.current_thread().name,
+        }
+        start = time.perf_counter()
+        try:
+            response = request(method, endpoint, *args, **kwargs)
+            call["status"] = getattr(response, "status_code", 200)
+            call["response_bytes"] = len(getattr(response, "content", b"") or b"")
+            return response
+        except gspread.exceptions.APIError as e:
+            call["status"] = e.response.status_code
+            raise
+        finally:
+            call["latency_ms"] = (time.perf_counter() - start) * 1000
+            log.record(call)
+
+    client.request = instrumented_request
+    return client
+
+def count_requests(client):
+    """Wrap client.request so every Sheets/Drive API call is tallied per thread."""
+    tally = threading.local()
+    request = client.request
+
+    def counted_request(*args, **kwargs):
+        tally.count = getattr(tally, "count", 0) + 1
+        return request(*args, **kwargs)
+
+    client.request = counted_request
+    client.request_tally = tally
+    return client
+
 @st.cache_resource
 def get_google_sheet():
+    if os.environ.get("ROBOLOG_FAKE_SHEETS"):
+        # Offline mode for benchmarks and load tests: synthetic data, no credentials needed
+        import fake_sheets
+        spreadsheet = fake_sheets.connect_from_env()
+        count_requests(schedule_requests(instrument_requests(spreadsheet.client, get_api_log()), get_request_scheduler()))
+        return spreadsheet
     creds = Credentials.from_service_account_file(
         SERVICE_ACCOUNT_FILE,
         scopes=SCOPES
     )
     client = gspread.authorize(creds)
+    client = count_requests(schedule_requests(instrument_requests(client, get_api_log()), get_request_scheduler()))
     return client.open_by_key(SHEET_ID)
 
+profiler.mark("connect")
+get_api_log().begin_rerun()
+
 try:
     sheet = get_google_sheet()
 except Exception as e:
@@ -438,186 +893,1669 @@ except Exception as e:
     st.stop()
 
 # ================= HELPERS =================
-def get_worksheet(name):
-    try:
-        return sheet.worksheet(name)
-    except gspread.WorksheetNotFound:
+profiler.mark("definitions")
+@st.cache_resource
+def get_worksheet_registry():
+    """Worksheet handles by title, filled from a single spreadsheet metadata fetch."""
+    return {}
+
+def refresh_worksheets():
+    """Reload every worksheet handle with one metadata request."""
+    registry = get_worksheet_registry()
+    handles = {ws.title: ws for ws in sheet.worksheets()}
+    registry.update(handles)
+    for title in set(registry) - set(handles):
+        registry.pop(title, None)
+    return registry
+
+def get_worksheet(name, refresh=False):
+    registry = get_worksheet_registry()
+    if refresh or name not in registry:
+        # An unknown title is treated like WorksheetNotFound: refetch the metadata once
+        registry = refresh_worksheets()
+    ws = registry.get(name)
+    if ws is None:
         st.error(f"❌ Worksheet '{name}' not found")
-        return None
+    return ws
 
 def normalize(value):
     return str(value).strip().lower()
 
+def normalize_mac(value):
+    """MAC address in a separator-free form, so 00:1B:44 and 00-1b-44 compare equal."""
+    mac = normalize(value)
+    for sep in (":", "-", ".", " "):
+        mac = mac.replace(sep, "")
+    return mac
+
+@st.cache_resource
+def get_header_cache():
+    """Header row and normalized header -> column index map per worksheet title."""
+    return {}
+
+def _rstrip_row(row):
+    row = list(row)
+    while row and not str(row[-1]).strip():
+        row.pop()
+    return row
+
+def _store_header_map(ws, headers, header_cache=None):
+    headers = _rstrip_row(headers)
+    columns = {}
+    for i, h in enumerate(headers):
+        if normalize(h):
+            columns.setdefault(normalize(h), i)
+    (get_header_cache() if header_cache is None else header_cache)[ws.title] = (headers, columns)
+    return headers, columns
+
+def get_header_map(ws, refresh=False):
+    """Return (headers, {normalized header: 0-based column}) for ws.
+
+    Row 1 is only read on the first use of a worksheet or when refresh=True.
+    """
+    entry = get_header_cache().get(ws.title)
+    if entry is None or refresh:
+        return _store_header_map(ws, ws.row_values(1))
+    return entry
+
+def sync_header_map(ws, header_row, header_cache=None):
+    """Use a header row that was fetched anyway; replaces the cached map if it changed.
+
+    Background threads pass header_cache in, since they can't call st.cache_resource.
+    """
+    header_cache = get_header_cache() if header_cache is None else header_cache
+    entry = header_cache.get(ws.title)
+    if entry is None or entry[0] != _rstrip_row(header_row):
+        return _store_header_map(ws, header_row, header_cache)
+    return entry
+
+def get_columns_for(ws, keys):
+    """Header map for ws that covers keys, re-reading row 1 once on a mismatch."""
+    headers, columns = get_header_map(ws)
+    if any(normalize(key) not in columns for key in keys):
+        headers, columns = get_header_map(ws, refresh=True)
+    return headers, columns
+
+def row_from_data(headers, columns, data: dict):
+    row = [""] * len(headers)
+    for key, value in data.items():
+        col = columns.get(normalize(key))
+        if col is not None:
+            row[col] = str(value)
+    return row
+
 def append_row_by_header(sheet_name, data: dict):
     ws = get_worksheet(sheet_name)
     if not ws:
         return False
-    headers = ws.row_values(1)
-    row = [""] * len(headers)
-    for key, value in data.items():
-        if key in headers:
-            row[headers.index(key)] = str(value)
-    ws.append_row(row)
+    headers, columns = get_columns_for(ws, data)
+    row = row_from_data(headers, columns, data)
+    index = get_robot_index()
+    # Robot Log writes are serialized so index row shifts can't interleave; the write
+    # waits for quota before the index is locked
+    with get_request_scheduler().reserved(writes=1), index.lock if sheet_name == "Robot Log" else nullcontext():
+        response = ws.append_row(row)
+        sheet_row = appended_row_number(response)
+        if sheet_row is None:
+            invalidate_sheets(sheet_name)
+        elif sheet_name == "Robot Log" and not index.is_stale():
+            index.put(sheet_row, dict(zip(headers, row)))
+            index.written(cache_appended_rows(ws, sheet_name, sheet_row, [row]))
+        else:
+            cache_appended_rows(ws, sheet_name, sheet_row, [row])
     return True
 
-def fetch_all(sheet_name):
+def appended_row_number(response):
+    """Sheet row written by a values.append call, or None if the response doesn't say."""
+    try:
+        updated_range = response["updates"]["updatedRange"]
+        return a1_to_rowcol(updated_range.split("!")[-1].split(":")[0])[0]
+    except (KeyError, TypeError, IndexError):
+        return None
+
+def batch_update_rows(ws, columns, row_updates: dict):
+    """Write {sheet_row: {header: value}} to ws in a single values batch update.
+
+    columns is the normalized header map from get_header_map. Every field gets
+    its own cell range, but the whole set is sent as one request instead of
+    one update_cell call per field. Returns the cells written as
+    {sheet_row: {0-based column: value}}.
+    """
+    data = []
+    cells = {}
+    for sheet_row, updates in row_updates.items():
+        for key, value in updates.items():
+            col = columns.get(normalize(key))
+            if col is not None:
+                data.append({
+                    "range": rowcol_to_a1(sheet_row, col + 1),
+                    "values": [[str(value)]]
+                })
+                cells.setdefault(sheet_row, {})[col] = str(value)
+    if data:
+        ws.batch_update(data, value_input_option=ValueInputOption.user_entered)
+    return cells
+
+@contextmanager
+def track_api_requests(action):
+    """Count the API requests made inside the block and remember them as the last save."""
+    tally = sheet.client.request_tally
+    start = getattr(tally, "count", 0)
+    get_api_log().set_context(action=action)
+    try:
+        yield
+    finally:
+        get_api_log().set_context(action=None)
+        st.session_state.last_save = {
+            "action": action,
+            "requests": getattr(tally, "count", 0) - start
+        }
+
+def record_from_row(headers, row):
+    return dict(zip(headers, numericise_all(row + [""] * (len(headers) - len(row)))))
+
+def records_from_values(values):
+    """Build get_all_records-style dicts from a get_all_values grid."""
+    if not values:
+        return []
+    headers = values[0]
+    return [record_from_row(headers, row) for row in values[1:]]
+
+def fetch_values(sheet_name):
     ws = get_worksheet(sheet_name)
     if not ws:
         return []
-    return ws.get_all_records()
+    # get_all_values is a single request and, unlike get_all_records, does not
+    # depend on the row count cached in a long-lived worksheet handle
+    values = ws.get_all_values()
+    if values:
+        sync_header_map(ws, values[0])
+    return values
+
+def fetch_all(sheet_name):
+    return records_from_values(fetch_values(sheet_name))
+
+def _column_letter(col):
+    return rowcol_to_a1(1, col).rstrip("0123456789")
+
+def _column_cells(values, col):
+    return [row[col] if col < len(row) else "" for row in values]
+
+def tail_probe_columns(sheet_name, entry):
+    """0-based probe columns when a cached entry may be extended with a tail fetch, else None."""
+    if (
+        entry is None
+        or not entry["values"]
+        or time.time() - entry.get("full_fetched_at", 0) > TAIL_FULL_RELOAD_INTERVAL
+    ):
+        return None
+    columns = {}
+    for i, h in enumerate(entry["values"][0]):
+        columns.setdefault(normalize(h), i)
+    probe = [columns.get(normalize(h)) for h in TAIL_FETCH_SHEETS.get(sheet_name, ())]
+    return probe if probe and None not in probe else None
+
+def extend_with_tail(entry, probe, probe_ranges, tail_range):
+    """Cached grid plus the fetched tail rows, or None when the cached rows no longer match.
+
+    The probe columns (fetched in full) must equal the cached ones row for row,
+    and the tail range, which starts at the last cached row, must repeat that row.
+    """
+    cached = entry["values"]
+    n = len(cached)
+    for col, value_range in zip(probe, probe_ranges):
+        live = [row[0] if row else "" for row in value_range.get("values", [])]
+        live += [""] * (n - len(live))
+        if live[:n] != _column_cells(cached, col):
+            return None
+    tail = tail_range.get("values", [])
+    if not tail or _rstrip_row(tail[0]) != _rstrip_row(cached[-1]):
+        return None
+    width = len(cached[0])
+    new_rows = []
+    for row in tail[1:]:
+        if len(row) > width:
+            return None
+        new_rows.append(list(row) + [""] * (width - len(row)))
+    return cached + new_rows
+
+def fetch_values_batch(handles, header_cache=None, previous=None):
+    """get_all_values for several worksheets ({title: handle}) in one values_batch_get request.
+
+    Returns {title: (values, full)}. Worksheets in TAIL_FETCH_SHEETS with a
+    cached entry in `previous` only fetch their probe columns and new rows
+    (full is False); any that fail the check are reloaded in a second request.
+    """
+    previous = previous or {}
+    ranges, plans = [], {}
+    for title, ws in handles.items():
+        entry = previous.get(title)
+        probe = tail_probe_columns(title, entry)
+        plans[title] = (entry if probe else None, probe, len(ranges))
+        if probe:
+            ranges += [absolute_range_name(title, f"{_column_letter(c + 1)}:{_column_letter(c + 1)}") for c in probe]
+            ranges.append(absolute_range_name(title, f"A{len(entry['values'])}:{_column_letter(ws.col_count)}"))
+        else:
+            ranges.append(absolute_range_name(title))
+    value_ranges = sheet.values_batch_get(ranges).get("valueRanges", []) if ranges else []
+
+    result, reload = {}, {}
+    for title, (entry, probe, start) in plans.items():
+        if entry is None:
+            values = value_ranges[start].get("values", []) if start < len(value_ranges) else []
+            values = fill_gaps(values) if values else []
+            if values:
+                sync_header_map(handles[title], values[0], header_cache)
+            result[title] = (values, True)
+            continue
+        values = extend_with_tail(entry, probe, value_ranges[start:start + len(probe)], value_ranges[start + len(probe)])
+        if values is None:
+            reload[title] = handles[title]
+        else:
+            result[title] = (values, False)
+    if reload:
+        result.update(fetch_values_batch(reload, header_cache))
+    return result
+
+def fetch_values_with_retry(sheet_names, previous=None):
+    """fetch_values_batch by title, retried when the API answers 429.
+
+    A 429 makes the request scheduler back off, so each retry waits there
+    for its turn along with every other session's requests. Missing worksheets come
+    back empty; once the retries run out, every worksheet comes back as
+    (None, True) so the cache knows the load failed.
+    """
+    handles, result = {}, {}
+    for sheet_name in sheet_names:
+        ws = get_worksheet(sheet_name)
+        if ws:
+            handles[sheet_name] = ws
+        else:
+            result[sheet_name] = ([], True)
+    if not handles:
+        return result
 
-# Add caching wrapper with longer TTL
-@st.cache_data(ttl=300)  # Cache for 5 minutes (300 seconds) to avoid rate limits
-def fetch_all_cached(sheet_name):
-    """Cached version of fetch_all to reduce API calls. Data refreshes every 5 minutes."""
-    import time
     max_retries = 3
-    retry_delay = 2  # seconds
-    
+
     for attempt in range(max_retries):
         try:
-            return fetch_all(sheet_name)
-        except Exception as e:
-            if "429" in str(e) or "RATE_LIMIT" in str(e):
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                    st.warning(f"⏳ Rate limit reached. Waiting {wait_time} seconds... (Attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
+            result.update(fetch_values_batch(handles, previous=previous))
+            return result
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code != 429:
+                raise
+    st.error("❌ Rate limit exceeded. Please wait a minute and refresh the page.")
+    return dict(result, **{sheet_name: (None, True) for sheet_name in handles})
+
+# ================= CHANGE PROBE =================
+class ChangeProbe(ABC):
+    """Cheap check for spreadsheet changes: token() returns equal values while nothing changed."""
+
+    @abstractmethod
+    def token(self):
+        ...
+
+class DriveModifiedTimeProbe(ChangeProbe):
+    """The spreadsheet file's modifiedTime, one Drive API request."""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def token(self):
+        return self.spreadsheet.get_lastUpdateTime()
+
+class SentinelRangeProbe(ChangeProbe):
+    """The contents of a small range (e.g. a last-modified cell) that every writer updates."""
+
+    def __init__(self, spreadsheet, range_name):
+        self.spreadsheet = spreadsheet
+        self.range_name = range_name
+
+    def token(self):
+        values = self.spreadsheet.values_get(self.range_name).get("values", [])
+        return tuple(tuple(row) for row in values)
+
+def make_change_probe(spreadsheet):
+    if CHANGE_PROBE == "drive":
+        return DriveModifiedTimeProbe(spreadsheet)
+    if CHANGE_PROBE == "sentinel" and CHANGE_PROBE_SENTINEL_RANGE:
+        return SentinelRangeProbe(spreadsheet, CHANGE_PROBE_SENTINEL_RANGE)
+    return None
+
+# ================= SHEET CACHE =================
+class SheetCache:
+    """Cached get_all_values grids and records, one versioned entry per worksheet.
+
+    Every load or invalidation gives a worksheet a new data version, so
+    anything derived from its data can tell when to rebuild. invalidate()
+    only evicts the worksheets it is given; the others stay cached.
+    Concurrent misses on the same worksheet share a single fetch, and with
+    SHEET_CACHE_BACKGROUND_REFRESH data past the soft limit is served as-is
+    while a background thread reloads it. Before refetching, the change
+    probe (if any) is asked whether the spreadsheet changed at all.
+    """
+
+    def __init__(self, probe=None):
+        self.lock = threading.Lock()
+        self.probe = probe
+        self.entries = {}
+        self.versions = {}
+        self.in_flight = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "fetches": 0, "coalesced": 0, "unchanged": 0}
+
+    def version(self, sheet_name):
+        return self.versions.get(sheet_name, 0)
+
+    @staticmethod
+    def max_age():
+        """Oldest data (in seconds) that may still be served."""
+        return SHEET_CACHE_HARD_TTL if SHEET_CACHE_BACKGROUND_REFRESH else SHEET_CACHE_SOFT_TTL
+
+    def fresh_entry(self, sheet_name):
+        entry = self.entries.get(sheet_name)
+        if entry is None or time.time() - entry["fetched_at"] > self.max_age():
+            return None
+        return entry
+
+    def load(self, sheet_name):
+        return self.load_many(sheet_name)[sheet_name]
+
+    def load_many(self, *sheet_names):
+        """Entries for several worksheets; all that need fetching come from one request."""
+        entries, stale, led, joined = {}, [], {}, {}
+        for sheet_name in sheet_names:
+            entry = self.fresh_entry(sheet_name)
+            if entry is not None:
+                entries[sheet_name] = entry
+                if time.time() - entry["fetched_at"] > SHEET_CACHE_SOFT_TTL:
+                    stale.append(sheet_name)
+                    self.stats["stale_hits"] += 1
                 else:
-                    st.error("❌ Rate limit exceeded. Please wait a minute and refresh the page.")
-                    return []
+                    self.stats["hits"] += 1
+                continue
+            flight, leader, version = self._join_flight(sheet_name)
+            (led if leader else joined)[sheet_name] = (flight, version)
+        if stale:
+            self.revalidate(*stale)
+        if led:
+            entries.update(self._fetch(led, fetch_values_with_retry))
+        for sheet_name, (flight, _) in joined.items():
+            flight["done"].wait()
+            if flight["error"] is not None and not flight["background"]:
+                raise flight["error"]
+            if flight["entry"] is None:
+                # A background refresh failed (e.g. a 429 its thread doesn't retry), or the
+                # leading rerun was stopped mid-fetch (st.rerun, st.stop, closed tab):
+                # load the sheet here instead, which retries or serves the cached data
+                entries[sheet_name] = self.load(sheet_name)
             else:
-                raise e
-    return []
+                entries[sheet_name] = flight["entry"]
+        return entries
+
+    def revalidate(self, *sheet_names):
+        """Reload worksheets in one background request, skipping those already being fetched."""
+        with self.lock:
+            sheet_names = [name for name in sheet_names if name not in self.in_flight]
+        # Resolve everything here: the background thread must not touch st.*
+        handles = {name: get_worksheet(name) for name in sheet_names}
+        handles = {name: ws for name, ws in handles.items() if ws}
+        header_cache = get_header_cache()
+        led = {}
+        for sheet_name in handles:
+            flight, leader, version = self._join_flight(sheet_name, coalesce=False)
+            if leader:
+                led[sheet_name] = (flight, version)
+        if not led:
+            return
+
+        def refresh():
+            try:
+                self._fetch(led, lambda names, previous: fetch_values_batch(
+                    {name: handles[name] for name in names}, header_cache, previous
+                ))
+            except Exception:
+                pass  # keep serving the cached data; the next load past the soft limit retries
+
+        threading.Thread(target=refresh, name=f"revalidate-{'+'.join(led)}", daemon=True).start()
+
+    def _join_flight(self, sheet_name, coalesce=True):
+        """Return (flight, is_leader, version); the leader must run _fetch for the flight.
+
+        coalesce=False is for background refreshes: joining them isn't counted, and
+        their errors aren't passed on to waiters.
+        """
+        with self.lock:
+            flight = self.in_flight.get(sheet_name)
+            if flight is None:
+                flight = self.in_flight[sheet_name] = {
+                    "done": threading.Event(), "entry": None, "error": None, "background": not coalesce
+                }
+                self.stats["fetches"] += 1
+                return flight, True, self.version(sheet_name)
+            if coalesce:
+                self.stats["coalesced"] += 1
+            return flight, False, None
+
+    def probe_token(self):
+        if self.probe is None:
+            return None
+        try:
+            return self.probe.token()
+        except Exception:
+            return None  # no answer from the probe: refetch as usual
+
+    def _restamp(self, flights, unchanged):
+        """Mark cached entries the probe vouched for as fresh again, keeping their versions."""
+        entries = {}
+        with self.lock:
+            for sheet_name, entry in unchanged.items():
+                flight, version = flights[sheet_name]
+                if self.version(sheet_name) == version and self.entries.get(sheet_name) is entry:
+                    entry = self.entries[sheet_name] = dict(entry, fetched_at=time.time())
+                self.stats["unchanged"] += 1
+                flight["entry"] = entries[sheet_name] = entry
+        return entries
+
+    def _fetch(self, flights, fetch):
+        """Run fetch(titles, previous) -> {title: (values, full)} for the flights this caller leads."""
+        try:
+            with self.lock:
+                previous = {sheet_name: self.entries.get(sheet_name) for sheet_name in flights}
+            # Only asked when some cached data could be vouched for (cold loads skip the
+            # extra round trip); taken before fetching, so a change made during the fetch
+            # still shows up next time
+            token = self.probe_token() if any(entry is not None for entry in previous.values()) else None
+            unchanged = {
+                sheet_name: entry for sheet_name, entry in previous.items()
+                if token is not None and entry is not None and entry.get("probe_token") == token
+            }
+            entries = self._restamp(flights, unchanged)
+            to_fetch = [sheet_name for sheet_name in flights if sheet_name not in unchanged]
+            if not to_fetch:
+                return entries
+            fetched = fetch(to_fetch, previous)
+            fetched_at = time.time()
+            failed = set()
+            for sheet_name in to_fetch:
+                values, full = fetched.get(sheet_name, ([], True))
+                if values is None:
+                    # The load failed: nothing is cached or stamped with the probe token. The
+                    # previous data is served and stays due for a reload; without any, an
+                    # empty entry marked failed is returned to this caller only
+                    failed.add(sheet_name)
+                    entries[sheet_name] = previous[sheet_name] or {
+                        "values": [], "records": [], "fetched_at": 0, "full_fetched_at": 0,
+                        "probe_token": None, "failed": True
+                    }
+                    continue
+                if full:
+                    records, full_fetched_at = records_from_values(values), fetched_at
+                else:
+                    # Tail fetch: only the appended rows need turning into records
+                    old = previous[sheet_name]
+                    records = old["records"] + [record_from_row(values[0], row) for row in values[len(old["values"]):]]
+                    full_fetched_at = old["full_fetched_at"]
+                entries[sheet_name] = {
+                    "values": values,
+                    "records": records,
+                    "fetched_at": fetched_at,
+                    "full_fetched_at": full_fetched_at,
+                    "probe_token": token
+                }
+            with self.lock:
+                for sheet_name in to_fetch:
+                    flight, version = flights[sheet_name]
+                    entry = flight["entry"] = entries[sheet_name]
+                    if sheet_name in failed:
+                        entry.setdefault("version", self.version(sheet_name))
+                        continue
+                    # Don't cache a load that raced with an invalidation of this sheet
+                    if self.version(sheet_name) == version:
+                        self.versions[sheet_name] = version + 1
+                        self.entries[sheet_name] = entry
+                    entry["version"] = self.version(sheet_name)
+            return entries
+        except Exception as e:
+            for flight, _ in flights.values():
+                flight["error"] = e
+            raise
+        finally:
+            with self.lock:
+                for sheet_name in flights:
+                    self.in_flight.pop(sheet_name, None)
+            for flight, _ in flights.values():
+                flight["done"].set()
+
+    def as_of(self):
+        """Fetch time of the oldest cached worksheet, or None when nothing is cached."""
+        with self.lock:
+            return min((entry["fetched_at"] for entry in self.entries.values()), default=None)
+
+    def invalidate(self, *sheet_names):
+        with self.lock:
+            for sheet_name in sheet_names or set(self.entries) | set(self.versions):
+                self.versions[sheet_name] = self.version(sheet_name) + 1
+                self.entries.pop(sheet_name, None)
+
+    def patch(self, sheet_name, edit):
+        """Apply edit(values, records) to copies of a cached entry as a new data version.
+
+        edit returns False when the write doesn't line up with the cached grid;
+        the sheet is then evicted instead. Returns the patched version, or None.
+        """
+        with self.lock:
+            entry = self.fresh_entry(sheet_name)
+            if entry is None:
+                return None
+            values, records = list(entry["values"]), list(entry["records"])
+            if not values or edit(values, records) is False:
+                self.versions[sheet_name] = self.version(sheet_name) + 1
+                self.entries.pop(sheet_name, None)
+                return None
+            version = self.version(sheet_name) + 1
+            self.versions[sheet_name] = version
+            # Readers keep whatever lists they already hold; patches never mutate them
+            self.entries[sheet_name] = dict(entry, values=values, records=records, version=version)
+            return version
 
-def find_robot(serial_number):
+@st.cache_resource
+def get_sheet_cache():
+    return SheetCache(make_change_probe(sheet))
+
+def fetch_all_cached(sheet_name):
+    """Cached records of a worksheet. Data refreshes every 5 minutes or when invalidated."""
+    return get_sheet_cache().load(sheet_name)["records"]
+
+def prefetch_sheets(*sheet_names):
+    """Load several worksheets into the cache with a single values_batch_get round trip."""
+    get_sheet_cache().load_many(*sheet_names)
+
+def sheet_version(sheet_name):
+    return get_sheet_cache().version(sheet_name)
+
+def invalidate_sheets(*sheet_names):
+    """Evict only the given worksheets from the data cache (all of them if none given)."""
+    get_sheet_cache().invalidate(*sheet_names)
+
+# ================= WRITE-THROUGH =================
+# After a successful write the same change is applied to the cached grid, so
+# the next rerun reads it without an API call. A background read of the
+# written rows then confirms the patch and evicts the sheet if they differ.
+# Each cache_* helper returns the patched data version (None if not cached).
+def confirm_cached_rows(ws, sheet_name, sheet_rows, version):
+    cache = get_sheet_cache()
+    scheduler = get_request_scheduler()
+
+    def check():
+        if scheduler.buckets["read"].headroom() < 1:
+            return  # no read quota to spare; the TTL reload will catch any drift
+        first, last = min(sheet_rows), max(sheet_rows)
+        try:
+            live = ws.get_values(f"{first}:{last}")
+        except Exception:
+            cache.invalidate(sheet_name)
+            return
+        entry = cache.entries.get(sheet_name)
+        if entry is None or entry["version"] != version:
+            return  # reloaded or patched again since; that change is checked on its own
+        for sheet_row in sheet_rows:
+            live_row = live[sheet_row - first] if sheet_row - first < len(live) else []
+            cached_row = entry["values"][sheet_row - 1] if sheet_row <= len(entry["values"]) else []
+            if _rstrip_row(live_row) != _rstrip_row(cached_row):
+                cache.invalidate(sheet_name)
+                return
+
+    threading.Thread(target=check, name=f"confirm-{sheet_name}", daemon=True).start()
+
+def cache_appended_rows(ws, sheet_name, first_row, rows):
+    def edit(values, records):
+        if first_row <= len(values):
+            return False
+        while len(values) < first_row - 1:
+            values.append([""] * len(values[0]))
+            records.append(record_from_row(values[0], []))
+        for row in rows:
+            values.append(list(row))
+            records.append(record_from_row(values[0], list(row)))
+
+    version = get_sheet_cache().patch(sheet_name, edit)
+    if version is not None:
+        confirm_cached_rows(ws, sheet_name, list(range(first_row, first_row + len(rows))), version)
+    return version
+
+def cache_updated_rows(ws, sheet_name, cells):
+    """cells is {sheet_row: {0-based column: value}} as returned by batch_update_rows."""
+    def edit(values, records):
+        for sheet_row, row_cells in cells.items():
+            if not 2 <= sheet_row <= len(values):
+                return False
+            row = list(values[sheet_row - 1])
+            row += [""] * (max(row_cells) + 1 - len(row))
+            for col, value in row_cells.items():
+                row[col] = value
+            values[sheet_row - 1] = row
+            records[sheet_row - 2] = record_from_row(values[0], row)
+
+    if not cells:
+        return None
+    version = get_sheet_cache().patch(sheet_name, edit)
+    if version is not None:
+        confirm_cached_rows(ws, sheet_name, list(cells), version)
+    return version
+
+def cache_deleted_row(ws, sheet_name, sheet_row):
+    def edit(values, records):
+        if not 2 <= sheet_row <= len(values):
+            return False
+        del values[sheet_row - 1]
+        del records[sheet_row - 2]
+
+    version = get_sheet_cache().patch(sheet_name, edit)
+    if version is not None:
+        # The row that moved up into sheet_row should now match the cache
+        confirm_cached_rows(ws, sheet_name, [sheet_row], version)
+    return version
+
+# ================= DATA FRAMES =================
+CATEGORY_COLUMNS = ("Status", "Robot Model", "Deployment Status", "Robot Deployed", "Maintance Package")
+DATE_COLUMNS = ("Cloud Activation Date", "Cloud Expiry", "Date of deployment", "Date of Issue")
+KEY_COLUMNS = ("Serial Number", "MAC Address")
+
+# Filtered and ranked row sets kept across reruns and sessions, bounded by their total
+# length: stored as int64 indexes, 2M rows take about 16 MB
+FILTER_MEMO_ROWS = 2_000_000
+ROBOT_LOG_PAGE_SIZES = [25, 50, 100, 250]
+ROBOT_PICKER_MATCHES = 20
+
+@st.cache_resource
+def get_frame_cache():
+    """Typed DataFrame per worksheet title, as (data version, frame)."""
+    return {}
+
+def build_frame(records):
+    df = pd.DataFrame(records)
+    for col in KEY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().astype("string")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype("category")
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            text = df[col].astype(str).str.strip()
+            dates = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+            # Keep the column as text if any non-empty value isn't a YYYY-MM-DD date
+            if not (dates.isna() & (text != "")).any():
+                df[col] = dates
+    return df
+
+def sheet_frame(sheet_name):
+    """Cached typed DataFrame of a worksheet, rebuilt once per data version.
+
+    The frame is shared by every session; filter it into new frames, never modify it.
+    """
+    entry = get_sheet_cache().load(sheet_name)
+    frames = get_frame_cache()
+    cached = frames.get(sheet_name)
+    if cached is not None and cached[0] == entry["version"]:
+        return cached[1]
+    df = build_frame(entry["records"])
+    frames[sheet_name] = (entry["version"], df)
+    return df
+
+class FilterMemo:
+    """LRU of filtered row labels keyed by (worksheet, data version, filter state).
+
+    Bounded by the total number of labels held (each entry also counts one),
+    so a few row sets of a very large sheet evict many small ones; a set
+    larger than the whole budget is not kept.
+    """
+
+    def __init__(self, max_rows):
+        self.max_rows = max_rows
+        self.rows = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "refined": 0}
+
+    def get(self, key):
+        with self.lock:
+            rows = self.entries.get(key)
+            if rows is not None:
+                self.entries.move_to_end(key)
+            return rows
+
+    def put(self, key, rows):
+        cost = len(rows) + 1
+        with self.lock:
+            if key in self.entries:
+                self.rows -= len(self.entries.pop(key)) + 1
+            if cost > self.max_rows:
+                return
+            self.entries[key] = rows
+            self.rows += cost
+            while self.rows > self.max_rows:
+                _, evicted = self.entries.popitem(last=False)
+                self.rows -= len(evicted) + 1
+
+@st.cache_resource
+def get_filter_memo():
+    return FilterMemo(FILTER_MEMO_ROWS)
+
+def _rows_of(df, rows):
+    return df if len(rows) == len(df) else df.loc[rows]
+
+def filter_frame(sheet_name, df, isin=(), search_columns=(), search=""):
+    """Rows of a worksheet's shared frame matching every (column, values) isin filter
+    and, if search is given, containing it (case-insensitively) in any search column.
+
+    Row sets are memoized per data version. A search that extends a memoized one
+    (the user typed more) only rescans the rows that one matched.
+    """
+    cached = get_frame_cache().get(sheet_name)
+    # Only the current shared frame's row sets are memoized; anything else gets a throwaway memo
+    memo = get_filter_memo() if cached is not None and cached[1] is df else FilterMemo(FILTER_MEMO_ROWS)
+    base_key = (sheet_name, cached[0] if cached is not None else None,
+                tuple((col, tuple(values)) for col, values in isin if col in df.columns))
+    rows = memo.get(base_key)
+    if rows is None:
+        memo.stats["misses"] += 1
+        mask = pd.Series(True, index=df.index)
+        for col, values in base_key[2]:
+            mask &= df[col].isin(values)
+        rows = df.index[mask.to_numpy()]
+        memo.put(base_key, rows)
+    else:
+        memo.stats["hits"] += 1
+
+    columns = tuple(col for col in search_columns if col in df.columns)
+    text = search.lower()
+    if not text or not columns:
+        return _rows_of(df, rows)
+    key = base_key + (columns, text)
+    found = memo.get(key)
+    if found is not None:
+        memo.stats["hits"] += 1
+        return _rows_of(df, found)
+
+    candidates = rows
+    for end in range(len(text) - 1, 0, -1):
+        narrower = memo.get(base_key + (columns, text[:end]))
+        if narrower is not None:
+            candidates = narrower
+            memo.stats["refined"] += 1
+            break
+    else:
+        memo.stats["misses"] += 1
+    subset = df.loc[candidates]
+    mask = pd.Series(False, index=subset.index)
+    for col in columns:
+        mask |= subset[col].astype(str).str.lower().str.contains(text, regex=False, na=False)
+    found = subset.index[mask.to_numpy()]
+    memo.put(key, found)
+    return _rows_of(df, found)
+
+def sort_frame(df, column, descending=False):
+    """Stable sort of a frame by one column; mixed-type text columns sort as strings."""
+    if column is None:
+        return df.iloc[::-1] if descending else df
+    key = (lambda col: col.astype(str).str.lower()) if df[column].dtype == object else None
+    return df.sort_values(column, ascending=not descending, kind="stable", na_position="last", key=key)
+
+def frame_page(df, page_key, page_size):
+    """The rows of df on the page stored under page_key, plus (page, page count).
+
+    The stored page is clamped first, so a filter that shrinks the frame
+    never leaves the page number out of range.
+    """
+    page_count = max(1, -(-len(df) // page_size))
+    page = min(max(1, int(st.session_state.get(page_key, 1))), page_count)
+    st.session_state[page_key] = page
+    return df.iloc[(page - 1) * page_size:page * page_size], page, page_count
+
+def match_robots(df, query):
+    """'Serial - Model' labels of robots whose serial contains query, prefix matches first."""
+    if "Serial Number" not in df.columns:
+        return []
+    query = query.strip().lower()
+    serials = df["Serial Number"].str.lower()
+    matches = df[serials.str.contains(query, regex=False, na=False)]
+    if matches.empty:
+        return []
+    order = (~serials[matches.index].str.startswith(query)).astype(int)
+    matches = matches.assign(_order=order).sort_values("_order", kind="stable").head(ROBOT_PICKER_MATCHES)
+    models = matches["Robot Model"].astype(str) if "Robot Model" in matches.columns else pd.Series("", index=matches.index)
+    return [f"{serial} - {model}" for serial, model in zip(matches["Serial Number"], models)]
+
+def frame_column_config(df):
+    return {col: st.column_config.DateColumn(col, format="YYYY-MM-DD") for col in DATE_COLUMNS
+            if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])}
+
+# ================= DASHBOARD =================
+ROBOT_CARD_HTML = """
+<div class="robot-card">
+    <div class="robot-card-title">🤖 {model}</div>
+    <div class="robot-card-total">{total}</div>
+    <div style="text-align: center; color: rgba(255,255,255,0.9); font-size: 0.9rem;">Total Units</div>
+    <div class="robot-card-stats">
+        <div class="robot-stat-item">
+            <div class="robot-stat-label">Deployed</div>
+            <div class="robot-stat-value status-deployed">{deployed}</div>
+        </div>
+        <div class="robot-stat-item">
+            <div class="robot-stat-label">Idle</div>
+            <div class="robot-stat-value status-idle">{idle}</div>
+        </div>
+        <div class="robot-stat-item">
+            <div class="robot-stat-label">Maintenance</div>
+            <div class="robot-stat-value status-maintenance">{maintenance}</div>
+        </div>
+    </div>
+</div>
+"""
+
+@st.cache_resource
+def get_dashboard_cache():
+    """Last computed Home dashboard, keyed by the Robot Log and Client Log data versions."""
+    return {}
+
+def _frame_column(df, col, default=""):
+    return df[col] if col in df.columns else pd.Series(default, index=df.index)
+
+def home_dashboard():
+    """Home page metrics and robot-type card HTML, computed once per data version."""
+    robots = sheet_frame("Robot Log")
+    clients = sheet_frame("Client Log")
+    frames = get_frame_cache()
+    key = (frames["Robot Log"][0], frames["Client Log"][0])
+    cache = get_dashboard_cache()
+    if cache.get("key") == key:
+        return cache["dashboard"]
+
+    # map() on a categorical column only runs once per category
+    status = _frame_column(robots, "Status").map(normalize).astype(str)
+    models = _frame_column(robots, "Robot Model", "Unknown").map(lambda v: str(v).strip()).astype(str)
+    client_names = _frame_column(clients, "Client Name").astype(str).str.strip().str.lower()
+
+    table = pd.crosstab(models, status)
+    cards = []
+    for model, counts in table.iterrows():
+        cards.append(ROBOT_CARD_HTML.format(
+            model=model,
+            total=int(counts.sum()),
+            deployed=int(counts.get("active", 0)),
+            idle=int(counts.get("idle", 0)),
+            maintenance=int(counts.get("maintenance", 0))
+        ))
+
+    dashboard = {
+        "total_robots": len(robots),
+        "active_robots": int((status == "active").sum()),
+        "unique_clients": int(client_names[client_names != ""].nunique()),
+        "cards": cards
+    }
+    cache["key"], cache["dashboard"] = key, dashboard
+    return dashboard
+
+# ================= TEXT SEARCH =================
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+def query_words(query):
+    """Whitespace-separated words of a search query that contain something searchable."""
+    return [word for word in str(query).lower().split() if tokenize(word)]
+
+class TextIndex:
+    """Inverted index over every cell of a cached worksheet grid.
+
+    Postings map a term to {record position: term count}. sync() indexes only
+    the rows appended since the last sync when the older rows are the very
+    same row lists (tail fetches and write-through appends keep them), and
+    rebuilds otherwise. Rows must match every query word and are ranked by
+    TF-IDF; every query term also matches inside longer terms, so results update as the user types
+    and part of a serial number is enough.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.version = None
+        self.values = []
+        self.postings = {}
+        self.terms = None  # sorted vocabulary, rebuilt lazily after changes
+
+    def sync(self, entry):
+        with self.lock:
+            if entry["version"] == self.version:
+                return
+            values = entry["values"]
+            n = len(self.values)
+            if not (self.values and len(values) >= n and all(a is b for a, b in zip(values, self.values))):
+                self.reset()
+                n = 1  # skip the header row
+            for row_number in range(max(n, 1), len(values)):
+                position = row_number - 1
+                for term in tokenize(" ".join(map(str, values[row_number]))):
+                    postings = self.postings.setdefault(term, {})
+                    postings[position] = postings.get(position, 0) + 1
+            if len(values) > n:
+                self.terms = None
+            self.values = values
+            self.version = entry["version"]
+
+    def _matching_terms(self, query_term):
+        """(term, weight) for every indexed term containing query_term.
+
+        The whole term weighs most, then terms it starts, then terms it is
+        part of further in (like the digits of a serial number).
+        """
+        i = bisect_left(self.terms, query_term)
+        while i < len(self.terms) and self.terms[i].startswith(query_term):
+            yield self.terms[i], 1.0 if self.terms[i] == query_term else 0.5
+            i += 1
+        for term in self.terms:
+            if query_term in term and not term.startswith(query_term):
+                yield term, 0.25
+
+    def search(self, query, limit=None):
+        """Record positions matching every word of the query, ranked by TF-IDF.
+
+        A word with punctuation in it, like a MAC address, must also appear
+        as typed inside one cell of the row.
+        """
+        with self.lock:
+            if self.terms is None:
+                self.terms = sorted(self.postings)
+            record_count = max(1, len(self.values) - 1)
+            scores = None
+            for word in query_words(query):
+                for query_term in set(tokenize(word)):
+                    term_scores = {}
+                    for term, weight in self._matching_terms(query_term):
+                        postings = self.postings[term]
+                        weight *= math.log(1 + record_count / len(postings))
+                        for position, count in postings.items():
+                            term_scores[position] = term_scores.get(position, 0.0) + weight * (1 + math.log(count))
+                    # Every word narrows the results
+                    scores = term_scores if scores is None else {
+                        position: score + term_scores[position]
+                        for position, score in scores.items() if position in term_scores
+                    }
+                if scores and re.search(r"[^a-z0-9]", word):
+                    scores = {
+                        position: score for position, score in scores.items()
+                        if any(word in str(cell).lower() for cell in self.values[position + 1])
+                    }
+        scores = scores or {}
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        return ranked[:limit] if limit else ranked
+
+@st.cache_resource
+def get_text_indexes():
+    """TextIndex per worksheet title."""
+    return {}
+
+def search_sheet(sheet_name, query):
+    """Record positions of a worksheet ranked against query (an int64 Index), from its text index."""
+    indexes = get_text_indexes()
+    index = indexes.setdefault(sheet_name, TextIndex())
+    index.sync(get_sheet_cache().load(sheet_name))
+    # Ranked results are memoized with the filter results, per index version and query words
+    memo = get_filter_memo()
+    key = (sheet_name, index.version, ("ranked",), tuple(sorted(set(query_words(query)))))
+    ranked = memo.get(key)
+    if ranked is None:
+        ranked = pd.Index(index.search(query), dtype="int64")
+        memo.put(key, ranked)
+    return ranked
+
+# ================= EXPORTS =================
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+EXPORT_CHUNK_ROWS = 10000
+EXPORT_CACHE_SIZE = 8  # prepared files kept in memory, least recently used dropped first
+SNAPSHOT_SHEETS = ["Robot Log", "Client Log", "Maintenance and troubleshooting log", "Robot Model"]
+
+@st.cache_resource
+def get_export_cache():
+    """Prepared export files by (what, data version, filters, format)."""
+    return OrderedDict()
+
+def _export_chunks(df):
+    for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        # Sheet columns can mix numbers and text; write them as text
+        for col in chunk.columns[chunk.dtypes == object]:
+            chunk = chunk.assign(**{col: chunk[col].astype(str)})
+        yield start, chunk
+
+def write_csv(df, out):
+    for start, chunk in _export_chunks(df):
+        chunk.to_csv(out, index=False, header=start == 0)
+
+def write_parquet(df, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    for _, chunk in _export_chunks(df):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+def write_xlsx(frames, out):
+    """One worksheet per {title: frame}, written row by row in write-only mode."""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for title, df in frames.items():
+        ws = workbook.create_sheet(title=title[:31])  # Excel's sheet title limit
+        ws.append([str(col) for col in df.columns])
+        for _, chunk in _export_chunks(df):
+            for row in chunk.astype(object).itertuples(index=False, name=None):
+                ws.append([None if pd.isna(value) else value for value in row])
+    workbook.save(out)
+
+def prepared_export(key):
+    cache = get_export_cache()
+    data = cache.get(key)
+    if data is not None:
+        cache.move_to_end(key)
+    return data
+
+def prepare_export(key, export_format, frames):
+    """Serialize frames ({title: frame}; CSV and Parquet take the first) and cache the file."""
+    out = io.BytesIO()
+    if export_format == "XLSX":
+        write_xlsx(frames, out)
+    elif export_format == "Parquet":
+        write_parquet(next(iter(frames.values())), out)
+    else:
+        write_csv(next(iter(frames.values())), out)
+    data = out.getvalue()
+    cache = get_export_cache()
+    cache[key] = data
+    while len(cache) > EXPORT_CACHE_SIZE:
+        cache.popitem(last=False)
+    return data
+
+def export_controls(sheet_name, df, filters, file_stem):
+    """Format picker plus a download button; the file is only built when asked for."""
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{file_stem}_export_format",
+            label_visibility="collapsed")
+    key = (sheet_name, get_frame_cache()[sheet_name][0], filters, export_format)
+    data = prepared_export(key)
+    with col2:
+        if data is None and st.button(f"📦 Prepare {export_format} export", key=f"{file_stem}_export_prepare"):
+            with st.spinner("Preparing export..."):
+                data = prepare_export(key, export_format, {sheet_name: df})
+        if data is not None:
+            extension, mime = EXPORT_FORMATS[export_format]
+            st.download_button(label=f"📥 Download as {export_format}", data=data,
+                file_name=f"{file_stem}_{datetime.now().strftime('%Y%m%d')}.{extension}", mime=mime)
+
+def snapshot_controls():
+    """Whole-workbook XLSX snapshot of every worksheet, built from the cached data."""
+    key = ("snapshot", tuple(sheet_version(name) for name in SNAPSHOT_SHEETS), (), "XLSX")
+    data = prepared_export(key)
+    if data is None and st.sidebar.button("📦 Prepare workbook snapshot", use_container_width=True):
+        with st.spinner("Preparing workbook snapshot..."):
+            prefetch_sheets(*SNAPSHOT_SHEETS)
+            frames = {name: sheet_frame(name) for name in SNAPSHOT_SHEETS}
+            key = ("snapshot", tuple(get_frame_cache()[name][0] for name in SNAPSHOT_SHEETS), (), "XLSX")
+            data = prepare_export(key, "XLSX", frames)
+    if data is not None:
+        st.sidebar.download_button(label="📥 Download workbook snapshot", data=data,
+            file_name=f"robot_deployment_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            mime=EXPORT_FORMATS["XLSX"][1], use_container_width=True)
+
+# ================= ROBOT INDEX =================
+class RobotIndex:
+    """Robot Log rows keyed by normalized serial number.
+
+    Each entry is [sheet row, record]; macs maps a normalized MAC address back
+    to the serials using it. The index is built from one full read and then
+    patched in place after the app's own appends, updates and deletes, so
+    lookups, row addressing and MAC checks never rescan the sheet.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self):
+        with self.lock:
+            self.headers = []
+            self.serial_key = None
+            self.mac_key = None
+            self.rows = {}
+            self.macs = {}
+            self.duplicates = set()
+            self.built_at = None
+            self.version = None
+
+    def is_stale(self):
+        return (
+            self.built_at is None
+            or self.version != sheet_version("Robot Log")
+            or time.time() - self.built_at > SheetCache.max_age()
+        )
+
+    def build(self, values, columns):
+        with self.lock:
+            self.invalidate()
+            serial_col = columns.get("serial number")
+            if not values or serial_col is None:
+                return
+            self.headers = _rstrip_row(values[0])
+            self.serial_key = self.headers[serial_col]
+            if "mac address" in columns:
+                self.mac_key = self.headers[columns["mac address"]]
+            for sheet_row, row in enumerate(values[1:], start=2):
+                serial = normalize(row[serial_col])
+                if not serial:
+                    continue
+                if serial in self.rows:
+                    # find_robot has always returned the first match
+                    self.duplicates.add(serial)
+                    continue
+                self.put(sheet_row, dict(zip(self.headers, row)))
+            self.built_at = time.time()
+
+    def written(self, version):
+        """Adopt the data version the cache got for a write this index was already patched for.
+
+        Only a direct successor of the indexed version is adopted; anything
+        else means the cached sheet was reloaded or evicted meanwhile.
+        """
+        with self.lock:
+            if version is not None and self.version == version - 1:
+                self.version = version
+
+    def get(self, serial_number):
+        return self.rows.get(normalize(serial_number))
+
+    def mac_holders(self, mac_address):
+        return self.macs.get(normalize_mac(mac_address), set())
+
+    def _unlink(self, serial):
+        entry = self.rows.pop(serial, None)
+        if entry is not None and self.mac_key:
+            mac = normalize_mac(entry[1].get(self.mac_key, ""))
+            holders = self.macs.get(mac)
+            if holders is not None:
+                holders.discard(serial)
+                if not holders:
+                    del self.macs[mac]
+        return entry
+
+    def put(self, sheet_row, record):
+        with self.lock:
+            serial = normalize(record.get(self.serial_key, ""))
+            if serial:
+                self._unlink(serial)
+                self.rows[serial] = [sheet_row, record]
+                mac = normalize_mac(record.get(self.mac_key, "")) if self.mac_key else ""
+                if mac:
+                    self.macs.setdefault(mac, set()).add(serial)
+
+    def update(self, serial_number, updates: dict, columns):
+        with self.lock:
+            entry = self._unlink(normalize(serial_number))
+            if entry is None:
+                return
+            # Copy so callers still holding the old record are not affected
+            record = dict(entry[1])
+            for key, value in updates.items():
+                col = columns.get(normalize(key))
+                if col is not None and col < len(self.headers):
+                    record[self.headers[col]] = str(value)
+            self.put(entry[0], record)
+
+    def remove(self, serial_number):
+        """Drop a deleted row and shift every row below it up by one."""
+        with self.lock:
+            serial = normalize(serial_number)
+            entry = self._unlink(serial)
+            if entry is None:
+                return
+            if serial in self.duplicates:
+                # The next duplicate becomes visible; only a rebuild knows where it is
+                self.invalidate()
+                return
+            for other in self.rows.values():
+                if other[0] > entry[0]:
+                    other[0] -= 1
+
+@st.cache_resource
+def get_robot_index():
+    return RobotIndex()
+
+def robot_index(refresh=False):
+    """Robot Log serial index, rebuilt once per data version of the cached sheet."""
+    index = get_robot_index()
+    if refresh:
+        invalidate_sheets("Robot Log")
     ws = get_worksheet("Robot Log")
     if not ws:
+        return index
+    # Loaded before taking the lock, so waiting for read quota doesn't hold up other
+    # sessions' lookups. Loading also starts a background refresh once past the soft limit.
+    entry = get_sheet_cache().load("Robot Log")
+    if entry.get("failed"):
+        # Checking serials and MACs against an empty index would let duplicates
+        # through; the rate-limit error is already on the page
+        st.stop()
+    with index.lock:
+        # Another session may have loaded or patched a newer version meanwhile
+        entry = get_sheet_cache().fresh_entry("Robot Log") or entry
+        if index.built_at is None or index.version != entry["version"]:
+            values = entry["values"]
+            headers, columns = sync_header_map(ws, values[0] if values else [])
+            index.build(values, columns)
+            index.built_at = entry["fetched_at"]
+            index.version = entry["version"]
+    return index
+
+def read_indexed_robot(ws, index, serial_number):
+    """Read back only the indexed row of a robot and refresh its index entry.
+
+    Returns the live record, or None if the row no longer holds that serial
+    (rows were edited in the sheet directly).
+    """
+    entry = index.get(serial_number)
+    if entry is None:
         return None
-    headers = ws.row_values(1)
-    serial_col = None
-    for i, h in enumerate(headers):
-        if h.strip().lower() == "serial number":
-            serial_col = i
-            break
-    if serial_col is None:
+    headers, columns = get_header_map(ws)
+    serial_col = columns.get("serial number")
+    row = ws.row_values(entry[0])
+    if serial_col is None or serial_col >= len(row) or normalize(row[serial_col]) != normalize(serial_number):
         return None
-    target = normalize(serial_number)
-    rows = ws.get_all_values()
-    for row in rows[1:]:
-        if normalize(row[serial_col]) == target:
-            return dict(zip(headers, row))
-    return None
+    record = dict(zip(index.headers, row + [""] * (len(index.headers) - len(row))))
+    index.put(entry[0], record)
+    return record
+
+def write_robot_row(ws, serial_number, write):
+    """Run write(sheet_row) under the index lock once the robot's row is confirmed live.
+
+    Robot Log is loaded before the lock is taken, so other sessions' lookups
+    never wait on a download; if the indexed row no longer holds the serial
+    it is re-downloaded once. Returns False when the robot isn't found.
+    """
+    index = get_robot_index()
+    for refresh in (False, True):
+        robot_index(refresh=refresh)
+        # Quota for the row read-back and the write is waited for before locking
+        with get_request_scheduler().reserved(reads=1, writes=1), index.lock:
+            if read_indexed_robot(ws, index, serial_number) is not None:
+                write(index.get(serial_number)[0])
+                return True
+    return False
+
+# ================= LOOKUP & UPDATE HELPERS =================
+def find_robot(serial_number):
+    entry = robot_index().get(serial_number)
+    if entry is None:
+        return None
+    return dict(entry[1])
 
 def update_robot(serial_number, updates: dict):
     ws = get_worksheet("Robot Log")
     if not ws:
         return False
-    headers = ws.row_values(1)
-    serial_col = None
-    for i, h in enumerate(headers):
-        if h.strip().lower() == "serial number":
-            serial_col = i
-            break
-    if serial_col is None:
-        return False
-    target = normalize(serial_number)
-    rows = ws.get_all_values()
-    for row_idx, row in enumerate(rows[1:], start=2):
-        if normalize(row[serial_col]) == target:
-            for key, value in updates.items():
-                for col_idx, h in enumerate(headers, start=1):
-                    if h.strip().lower() == key.strip().lower():
-                        ws.update_cell(row_idx, col_idx, str(value))
-            return True
-    return False
+    index = get_robot_index()
+
+    def write(sheet_row):
+        headers, columns = get_columns_for(ws, updates)
+        cells = batch_update_rows(ws, columns, {sheet_row: updates})
+        index.update(serial_number, updates, columns)
+        index.written(cache_updated_rows(ws, "Robot Log", cells))
+
+    return write_robot_row(ws, serial_number, write)
+
+def deploy_robots(serials, client_name, location, cloud_store_group, maintenance_package):
+    """Deploy several robots to one client with one read and two writes.
+
+    Robot Log is re-read once to check that every robot is still idle, all
+    status changes go out as one batch update and all Client Log rows as one
+    append_rows call. The written rows are then read back to confirm the
+    cache while there is read headroom. Returns a result dict per serial whose
+    "error" is None when that robot was deployed.
+    """
+    results = [{"serial": serial, "robot": None, "error": None} for serial in serials]
+    robot_ws = get_worksheet("Robot Log")
+    client_ws = get_worksheet("Client Log")
+    if not robot_ws or not client_ws:
+        for result in results:
+            result["error"] = f"Robot {result['serial']} not deployed: worksheet not available"
+        return results
+
+    robot_updates = {
+        "Status": "Active",
+        "Outlet using": client_name,
+        "Maintenance Plan": maintenance_package,
+        "Cloud Store Group": cloud_store_group
+    }
+    # Re-downloaded before the lock is taken; writes made meanwhile update the index too
+    index = robot_index(refresh=True)
+    with get_request_scheduler().reserved(writes=1), index.lock:
+        row_updates = {}
+        for result in results:
+            entry = index.get(result["serial"])
+            if entry is None:
+                result["error"] = f"Robot {result['serial']} not found"
+            elif normalize(entry[1].get("Status", "")) != "idle":
+                result["error"] = f"Robot {result['serial']} is not idle (Current: {entry[1].get('Status', '')})"
+            else:
+                result["robot"] = dict(entry[1])
+                row_updates[entry[0]] = robot_updates
+        if not row_updates:
+            return results
+        headers, columns = get_columns_for(robot_ws, robot_updates)
+        cells = batch_update_rows(robot_ws, columns, row_updates)
+        for result in results:
+            if result["robot"] is not None:
+                index.update(result["serial"], robot_updates, columns)
+        index.written(cache_updated_rows(robot_ws, "Robot Log", cells))
+
+    deployed = [result for result in results if result["robot"] is not None]
+    client_data = [{
+        "Client Name": client_name,
+        "Location": location,
+        "Date of deployment": datetime.today().strftime("%Y-%m-%d"),
+        "Deplyoment Type": "Deployment",
+        "Deployment Status": "Active",
+        "Maintance Package": maintenance_package,
+        "Cloud Store Group": cloud_store_group,
+        "Robot Deployed": result["robot"].get("Robot Model", ""),
+        "Serial Number": result["serial"],
+        "MAC Address": result["robot"].get("MAC Address", "")
+    } for result in deployed]
+    headers, columns = get_columns_for(client_ws, client_data[0])
+    rows = [row_from_data(headers, columns, data) for data in client_data]
+    try:
+        response = client_ws.append_rows(rows)
+    except gspread.exceptions.APIError as e:
+        for result in deployed:
+            result["error"] = f"Robot {result['serial']} set to Active but its Client Log row was not written: {e}"
+        return results
+    first_row = appended_row_number(response)
+    if first_row is None:
+        invalidate_sheets("Client Log")
+    else:
+        cache_appended_rows(client_ws, "Client Log", first_row, rows)
+    return results
+
+def cloud_expiry_date(cloud_date, cloud_period):
+    """Cloud Expiry as YYYY-MM-DD, counting 30 days per month; ValueError past 9999-12-31."""
+    try:
+        activation_date = datetime.combine(cloud_date, datetime.min.time())
+        return (activation_date + timedelta(days=int(cloud_period) * 30)).strftime("%Y-%m-%d")
+    except OverflowError:
+        raise ValueError(f"A Cloud Activation Period of {cloud_period} months ends after 9999-12-31") from None
+
+def new_robot_entry(robot_model, serial_number, mac_address, cloud_period, cloud_date, cloud_store_group):
+    """Robot Log fields for a newly added, idle robot; ValueError if the expiry is out of range."""
+    cloud_expiry = cloud_expiry_date(cloud_date, cloud_period)
+    return {
+        "Robot Model": robot_model,
+        "Serial Number": serial_number,
+        "MAC Address": mac_address,
+        "Cloud Activation Period (Months)": str(cloud_period),
+        "Cloud Activation Date": cloud_date.strftime("%Y-%m-%d"),
+        "Cloud Expiry": cloud_expiry,
+        "Cloud Store Group": cloud_store_group,
+        "Maintenance Plan": "",
+        "Outlet using": "",
+        "Status": "Idle"
+    }
 
 def check_mac_exists(mac_address, exclude_serial=None):
-    robots = fetch_all_cached("Robot Log")
-    for r in robots:
-        if normalize(r.get("MAC Address", "")) == normalize(mac_address):
-            if exclude_serial and normalize(r.get("Serial Number", "")) == normalize(exclude_serial):
-                continue
+    """True if another robot already uses this MAC address.
+
+    The MAC index answers in constant time; only a candidate match is
+    confirmed against the live sheet, and a stale match triggers one rebuild.
+    """
+    index = robot_index()
+    excluded = {normalize(exclude_serial)} if exclude_serial else set()
+    holders = index.mac_holders(mac_address) - excluded
+    if not holders:
+        return False
+    ws = get_worksheet("Robot Log")
+    if not ws:
+        return True
+    for serial in list(holders):
+        record = read_indexed_robot(ws, index, serial)
+        if record is not None and normalize_mac(record.get(index.mac_key, "")) == normalize_mac(mac_address):
             return True
-    return False
+    return bool(robot_index(refresh=True).mac_holders(mac_address) - excluded)
 
 def delete_robot_row(serial_number):
     """Actually delete the row from Robot Log sheet"""
     ws = get_worksheet("Robot Log")
     if not ws:
         return False
-    headers = ws.row_values(1)
-    serial_col = None
-    for i, h in enumerate(headers):
-        if h.strip().lower() == "serial number":
-            serial_col = i
-            break
-    if serial_col is None:
-        return False
-    target = normalize(serial_number)
-    rows = ws.get_all_values()
-    for row_idx, row in enumerate(rows[1:], start=2):
-        if normalize(row[serial_col]) == target:
-            ws.delete_rows(row_idx)
-            return True
-    return False
+    index = get_robot_index()
+
+    def write(sheet_row):
+        ws.delete_rows(sheet_row)
+        index.remove(serial_number)
+        index.written(cache_deleted_row(ws, "Robot Log", sheet_row))
+
+    return write_robot_row(ws, serial_number, write)
 
 def set_client_inactive_by_serial(serial_number):
     """Set Deployment Status to Inactive for all client rows matching a serial number"""
     ws = get_worksheet("Client Log")
     if not ws:
         return
-    headers = ws.row_values(1)
-    serial_col = None
-    status_col = None
-    for i, h in enumerate(headers):
-        if h.strip().lower() == "serial number":
-            serial_col = i
-        if h.strip().lower() == "deployment status":
-            status_col = i
-    if serial_col is None or status_col is None:
+    rows = ws.get_all_values()
+    if not rows:
+        return
+    headers, columns = sync_header_map(ws, rows[0])
+    serial_col = columns.get("serial number")
+    if serial_col is None or "deployment status" not in columns:
         return
     target = normalize(serial_number)
-    rows = ws.get_all_values()
-    for row_idx, row in enumerate(rows[1:], start=2):
-        if normalize(row[serial_col]) == target:
-            ws.update_cell(row_idx, status_col + 1, "Inactive")
+    cells = batch_update_rows(ws, columns, {
+        row_idx: {"Deployment Status": "Inactive"}
+        for row_idx, row in enumerate(rows[1:], start=2)
+        if normalize(row[serial_col]) == target
+    })
+    cache_updated_rows(ws, "Client Log", cells)
+
+def _is_same_record(headers, row, record):
+    live = record_from_row(headers, row)
+    return all(live.get(key) == value for key, value in record.items() if key)
+
+def locate_client_row(ws, row_index, expected):
+    """Sheet row of a cached Client Log record, confirmed against the live sheet before it is written.
+
+    If the row no longer holds the record as it was shown (rows moved, or someone
+    else edited it), the sheet is reloaded once and the record looked up again.
+    Returns None when it can't be found unchanged, so stale form values are
+    never written over another operator's edit.
+    """
+    sheet_row = row_index + 2  # +2: header + 1-based
+    headers, columns = get_header_map(ws)
+    if _is_same_record(headers, ws.row_values(sheet_row), expected):
+        return sheet_row
+    invalidate_sheets("Client Log")
+    values = get_sheet_cache().load("Client Log")["values"]
+    for sheet_row, row in enumerate(values[1:], start=2):
+        if _is_same_record(values[0], row, expected):
+            return sheet_row
+    return None
 
-def delete_client_row(row_index):
-    """Delete a client row. row_index is 0-based index from get_all_records list"""
+def delete_client_row(row_index, expected):
+    """Delete a client row. row_index is 0-based index from get_all_records list,
+    expected the record at that index as shown to the user."""
     ws = get_worksheet("Client Log")
     if not ws:
         return False
-    # +2 because: +1 for header row, +1 because sheet rows are 1-based
-    ws.delete_rows(row_index + 2)
+    sheet_row = locate_client_row(ws, row_index, expected)
+    if sheet_row is None:
+        return False
+    ws.delete_rows(sheet_row)
+    cache_deleted_row(ws, "Client Log", sheet_row)
     return True
 
-def update_client_row(row_index, updates: dict):
-    """Update a client row. row_index is 0-based index from get_all_records list"""
+def update_client_row(row_index, expected, updates: dict):
+    """Update a client row. row_index is 0-based index from get_all_records list,
+    expected the record at that index as shown to the user."""
     ws = get_worksheet("Client Log")
     if not ws:
         return False
-    headers = ws.row_values(1)
-    sheet_row = row_index + 2  # +2: header + 1-based
-    for key, value in updates.items():
-        for col_idx, h in enumerate(headers, start=1):
-            if h.strip().lower() == key.strip().lower():
-                ws.update_cell(sheet_row, col_idx, str(value))
+    sheet_row = locate_client_row(ws, row_index, expected)
+    if sheet_row is None:
+        return False
+    headers, columns = get_columns_for(ws, updates)
+    cells = batch_update_rows(ws, columns, {sheet_row: updates})
+    cache_updated_rows(ws, "Client Log", cells)
     return True
 
+# ================= BULK IMPORT =================
+def iter_import_rows(uploaded_file):
+    """Yield (file row number, {normalized header: value}) from a CSV or XLSX upload.
+
+    Rows are read one at a time, so large shipment files are never loaded
+    into memory as a whole. A file that can't be read raises ValueError with
+    a message for the user, possibly after some rows were already yielded.
+    """
+    try:
+        if uploaded_file.name.lower().endswith(".xlsx"):
+            from openpyxl import load_workbook
+            workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+        else:
+            rows = csv.reader(io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline=""))
+        header = next(rows, None)
+        if header is None:
+            return
+        keys = [normalize(h) if h is not None else "" for h in header]
+        for row_number, row in enumerate(rows, start=2):
+            values = {key: ("" if value is None else value) for key, value in zip(keys, row) if key}
+            if any(str(value).strip() for value in values.values()):
+                yield row_number, values
+    except UnicodeDecodeError:
+        raise ValueError('The file is not UTF-8 text. In Excel, save it as "CSV UTF-8" or as .xlsx') from None
+    except (csv.Error, zipfile.BadZipFile) as e:
+        raise ValueError(f"The file could not be read: {e}") from None
+
+def parse_activation_period(value, default):
+    """Whole months from a cell; "12" and 12.0 are fine, "12.7" and "inf" raise ValueError."""
+    text = str(value).strip() if value is not None else ""
+    if not text:
+        return int(default)
+    period = float(text)
+    if not period.is_integer():
+        raise ValueError(f"{text} is not a whole number of months")
+    return int(period)
+
+def parse_activation_date(value, default):
+    if value in ("", None):
+        return default
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), "%Y-%m-%d").date()
+
+def import_robots(rows, default_model, default_period, default_date, available_types):
+    """Validate uploaded robot rows and append the accepted ones in one append_rows call.
+
+    Serial numbers and MAC addresses are checked against the Robot Log index
+    (refreshed once up front) and against earlier rows of the same file.
+    Returns (number of robots imported, list of rejected-row dicts).
+    """
+    ws = get_worksheet("Robot Log")
+    if not ws:
+        return 0, []
+    models = {normalize(t): t for t in available_types}
+    accepted, rejected = [], []
+    file_serials, file_macs = set(), set()
+
+    index = robot_index(refresh=True)
+    with get_request_scheduler().reserved(writes=1), index.lock:
+        for row_number, values in rows:
+            serial = str(values.get("serial number", "")).strip()
+            mac = str(values.get("mac address", "")).strip()
+            model = str(values.get("robot model", "")).strip() or default_model
+            reason = None
+            try:
+                period = parse_activation_period(values.get("cloud activation period (months)", ""), default_period)
+                cloud_date = parse_activation_date(values.get("cloud activation date", ""), default_date)
+            except ValueError:
+                period, cloud_date = None, None
+                reason = "Invalid Cloud Activation Period or Date (use whole months and YYYY-MM-DD)"
+
+            if reason:
+                pass
+            elif not serial or not mac:
+                reason = "Serial Number and MAC Address are required"
+            elif normalize(model) not in models:
+                reason = f"Unknown Robot Model '{model}'"
+            elif period < 1:
+                reason = "Cloud Activation Period must be at least 1 month"
+            elif index.get(serial) is not None:
+                reason = "Serial Number already exists"
+            elif normalize(serial) in file_serials:
+                reason = "Serial Number repeated in file"
+            elif index.mac_holders(mac):
+                reason = "MAC Address already exists"
+            elif normalize_mac(mac) in file_macs:
+                reason = "MAC Address repeated in file"
+            else:
+                try:
+                    entry = new_robot_entry(
+                        models[normalize(model)], serial, mac, period, cloud_date,
+                        str(values.get("cloud store group", "")).strip()
+                    )
+                except ValueError as e:
+                    reason = str(e)
+
+            if reason:
+                rejected.append({"Row": row_number, "Serial Number": serial, "MAC Address": mac, "Reason": reason})
+                continue
+            file_serials.add(normalize(serial))
+            file_macs.add(normalize_mac(mac))
+            accepted.append(entry)
+
+        if accepted:
+            headers, columns = get_columns_for(ws, accepted[0])
+            new_rows = [row_from_data(headers, columns, data) for data in accepted]
+            first_row = appended_row_number(ws.append_rows(new_rows))
+            if first_row is None:
+                invalidate_sheets("Robot Log")
+            else:
+                for offset, row in enumerate(new_rows):
+                    index.put(first_row + offset, dict(zip(headers, row)))
+                index.written(cache_appended_rows(ws, "Robot Log", first_row, new_rows))
+    return len(accepted), rejected
+
 # ================= MAIN APP =================
+if profiler.enabled:
+    for helper in PROFILED_HELPERS:
+        globals()[helper] = profiler.wrap(globals()[helper])
+profiler.mark("header")
+
 # Theme toggle button (top left)
 col_toggle, col_title, col_refresh = st.columns([1, 9, 2])
 with col_toggle:
     if st.session_state.theme == 'dark':
         if st.button("☀️ Light", key="theme_toggle", help="Switch to Light Mode"):
             st.session_state.theme = 'light'
-            st.cache_data.clear()
             st.rerun()
     else:
         if st.button("🌙 Dark", key="theme_toggle", help="Switch to Dark Mode"):
             st.session_state.theme = 'dark'
-            st.cache_data.clear()
             st.rerun()
 
 with col_title:
@@ -625,81 +2563,63 @@ with col_title:
 
 with col_refresh:
     if st.button("🔄 Refresh Data", help="Clear cache and reload data from Google Sheets"):
-        st.cache_data.clear()
+        invalidate_sheets()
+        get_header_cache().clear()
+        get_worksheet_registry().clear()
+        get_frame_cache().clear()
+        get_dashboard_cache().clear()
+        get_text_indexes().clear()
+        get_export_cache().clear()
         st.success("✅ Cache cleared!")
         st.rerun()
 
-# Show cache info
-st.caption("💡 Data is cached for 5 minutes to avoid API limits. Click 'Refresh Data' to force update.")
+# Show cache info; filled in at the end of the run, once the page has loaded its data
+data_as_of = st.empty()
 
 # Check if there's a page in query params (from quick actions)
+profiler.mark("navigation")
 query_params = st.query_params
 if "page" in query_params:
     default_menu = query_params["page"]
 else:
     default_menu = "Home"
 
+pages = ["Home", "Add Robot", "Deploy Robot", "Add Maintenance",
+         "View Robot Log", "View Client Log", "View Maintenance Log", "Diagnostics"]
 menu = st.sidebar.selectbox(
     "Navigation",
-    ["Home", "Add Robot", "Deploy Robot", "Add Maintenance",
-     "View Robot Log", "View Client Log", "View Maintenance Log"],
-    index=["Home", "Add Robot", "Deploy Robot", "Add Maintenance",
-           "View Robot Log", "View Client Log", "View Maintenance Log"].index(default_menu) if default_menu in ["Home", "Add Robot", "Deploy Robot", "Add Maintenance", "View Robot Log", "View Client Log", "View Maintenance Log"] else 0
+    pages,
+    index=pages.index(default_menu) if default_menu in pages else 0
 )
+get_api_log().set_context(page=menu)
+profiler.page = menu
+profiler.mark(f"page: {menu}")
 
 # ================= HOME =================
 if menu == "Home":
     st.header("Welcome to Robot Deployment System")
     
     # Fetch all data ONCE with caching
-    robots = fetch_all_cached("Robot Log")
-    clients = fetch_all_cached("Client Log")
+    prefetch_sheets("Robot Log", "Client Log", "Robot Model")
+    dashboard = home_dashboard()
     robot_types_data = fetch_all_cached("Robot Model")
     
-    # Count unique client names
-    unique_clients = set()
-    for c in clients:
-        client_name = str(c.get("Client Name", "")).strip()
-        if client_name:
-            unique_clients.add(client_name.lower())
-    
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Robots", len(robots))
+        st.metric("Total Robots", dashboard["total_robots"])
     with col2:
-        active = sum(1 for r in robots if normalize(r.get("Status", "")) == "active")
-        st.metric("Active Robots", active)
+        st.metric("Active Robots", dashboard["active_robots"])
     with col3:
-        st.metric("Unique Clients", len(unique_clients))
+        st.metric("Unique Clients", dashboard["unique_clients"])
 
     st.markdown("---")
     
     # Robot Type Statistics - Card Layout
     st.subheader("📊 Robot Types Overview")
     
-    # Count by robot model
-    robot_stats = {}
-    for r in robots:
-        model = str(r.get("Robot Model", "Unknown")).strip()
-        status = normalize(r.get("Status", ""))
-        
-        if model not in robot_stats:
-            robot_stats[model] = {"total": 0, "deployed": 0, "idle": 0, "maintenance": 0, "retired": 0}
-        
-        robot_stats[model]["total"] += 1
-        
-        if status == "active":
-            robot_stats[model]["deployed"] += 1
-        elif status == "idle":
-            robot_stats[model]["idle"] += 1
-        elif status == "maintenance":
-            robot_stats[model]["maintenance"] += 1
-        elif status == "retired":
-            robot_stats[model]["retired"] += 1
-    
-    if robot_stats:
+    cards = dashboard["cards"]
+    if cards:
         # Create smooth card layout - 3 cards per row
-        sorted_models = sorted(robot_stats.items())
         
         # Custom CSS for cards
         st.markdown("""
@@ -757,33 +2677,11 @@ if menu == "Home":
         """, unsafe_allow_html=True)
         
         # Display cards in rows of 3
-        for i in range(0, len(sorted_models), 3):
+        for i in range(0, len(cards), 3):
             cols = st.columns(3)
-            for j in range(3):
-                if i + j < len(sorted_models):
-                    model, counts = sorted_models[i + j]
-                    with cols[j]:
-                        st.markdown(f"""
-                        <div class="robot-card">
-                            <div class="robot-card-title">🤖 {model}</div>
-                            <div class="robot-card-total">{counts['total']}</div>
-                            <div style="text-align: center; color: rgba(255,255,255,0.9); font-size: 0.9rem;">Total Units</div>
-                            <div class="robot-card-stats">
-                                <div class="robot-stat-item">
-                                    <div class="robot-stat-label">Deployed</div>
-                                    <div class="robot-stat-value status-deployed">{counts['deployed']}</div>
-                                </div>
-                                <div class="robot-stat-item">
-                                    <div class="robot-stat-label">Idle</div>
-                                    <div class="robot-stat-value status-idle">{counts['idle']}</div>
-                                </div>
-                                <div class="robot-stat-item">
-                                    <div class="robot-stat-label">Maintenance</div>
-                                    <div class="robot-stat-value status-maintenance">{counts['maintenance']}</div>
-                                </div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+            for j, card in enumerate(cards[i:i + 3]):
+                with cols[j]:
+                    st.markdown(card, unsafe_allow_html=True)
     else:
         st.info("No robot data available")
 
@@ -807,14 +2705,12 @@ if menu == "Home":
                 if new_robot_type.strip() in existing_types:
                     st.error("❌ This robot type already exists!")
                 else:
-                    success = append_row_by_header("Robot Model", {
-                        "Robot Type": new_robot_type.strip()
-                    })
+                    with track_api_requests("Add Robot Type"):
+                        success = append_row_by_header("Robot Model", {
+                            "Robot Type": new_robot_type.strip()
+                        })
                     if success:
                         st.success(f"✅ Robot type '{new_robot_type}' added successfully!")
-                        # Clear cache to refresh data
-                        st.cache_data.clear()
-                        st.cache_data.clear()
                         st.rerun()
                     else:
                         st.error("❌ Failed to add robot type")
@@ -836,17 +2732,14 @@ if menu == "Home":
         if st.button("➕ Add New Robot", use_container_width=True, key="home_add_robot"):
             # Use query params to navigate
             st.query_params["page"] = "Add Robot"
-            st.cache_data.clear()
             st.rerun()
     with col2:
         if st.button("🚀 Deploy Robot", use_container_width=True, key="home_deploy_robot"):
             st.query_params["page"] = "Deploy Robot"
-            st.cache_data.clear()
             st.rerun()
     with col3:
         if st.button("🔧 Add Maintenance", use_container_width=True, key="home_add_maintenance"):
             st.query_params["page"] = "Add Maintenance"
-            st.cache_data.clear()
             st.rerun()
 
 # ================= ADD ROBOT =================
@@ -861,53 +2754,86 @@ elif menu == "Add Robot":
         st.warning("⚠️ No robot types available. Please add robot types on the Home page first.")
         if st.button("← Go to Home to Add Robot Types"):
             st.query_params["page"] = "Home"
-            st.cache_data.clear()
             st.rerun()
     else:
-        with st.form("add_robot_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                robot_model = st.selectbox("Robot Model *", options=available_types, help="Select from predefined robot types")
-                serial_number = st.text_input("Serial Number *", placeholder="e.g., SN123456")
-                mac_address = st.text_input("MAC Address *", placeholder="e.g., 00:1B:44:11:3A:B7")
-            with col2:
-                cloud_period = st.number_input("Cloud Activation Period (Months) *", min_value=1, value=12)
-                cloud_date = st.date_input("Cloud Activation Date *", value=datetime.today())
-                cloud_store_group = st.text_input("Cloud Store Group (Optional)")
-
-            submitted = st.form_submit_button("Add Robot", use_container_width=True)
-            if submitted:
-                if not all([robot_model, serial_number, mac_address]):
-                    st.error("❌ Please fill in all required fields")
-                elif find_robot(serial_number):
-                    st.error(f"❌ Serial Number '{serial_number}' already exists!")
-                elif check_mac_exists(mac_address, None):
-                    st.error(f"❌ MAC Address '{mac_address}' already exists!")
+        single_tab, import_tab = st.tabs(["➕ Single Robot", "📥 Bulk Import"])
+
+        with single_tab:
+            with st.form("add_robot_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    robot_model = st.selectbox("Robot Model *", options=available_types, help="Select from predefined robot types")
+                    serial_number = st.text_input("Serial Number *", placeholder="e.g., SN123456")
+                    mac_address = st.text_input("MAC Address *", placeholder="e.g., 00:1B:44:11:3A:B7")
+                with col2:
+                    cloud_period = st.number_input("Cloud Activation Period (Months) *", min_value=1, value=12)
+                    cloud_date = st.date_input("Cloud Activation Date *", value=datetime.today())
+                    cloud_store_group = st.text_input("Cloud Store Group (Optional)")
+
+                submitted = st.form_submit_button("Add Robot", use_container_width=True)
+                if submitted:
+                    if not all([robot_model, serial_number, mac_address]):
+                        st.error("❌ Please fill in all required fields")
+                    elif find_robot(serial_number):
+                        st.error(f"❌ Serial Number '{serial_number}' already exists!")
+                    elif check_mac_exists(mac_address, None):
+                        st.error(f"❌ MAC Address '{mac_address}' already exists!")
+                    else:
+                        try:
+                            entry = new_robot_entry(
+                                robot_model, serial_number, mac_address,
+                                cloud_period, cloud_date, cloud_store_group
+                            )
+                        except ValueError as e:
+                            st.error(f"❌ {e}")
+                        else:
+                            with track_api_requests("Add Robot"):
+                                success = append_row_by_header("Robot Log", entry)
+                            if success:
+                                st.success(f"✅ Robot '{robot_model}' added successfully!")
+                                st.balloons()
+                            else:
+                                st.error("❌ Failed to add robot")
+
+        with import_tab:
+            st.write("Upload a CSV or XLSX file with one robot per row. Required columns: **Serial Number**, **MAC Address**. "
+                     "Optional: Robot Model, Cloud Activation Period (Months), Cloud Activation Date (YYYY-MM-DD), Cloud Store Group. "
+                     "Empty optional cells use the defaults below.")
+            with st.form("import_robots_form"):
+                uploaded_file = st.file_uploader("Robot file *", type=["csv", "xlsx"])
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    default_model = st.selectbox("Default Robot Model", options=available_types)
+                with col2:
+                    default_period = st.number_input("Default Cloud Activation Period (Months)", min_value=1, value=12)
+                with col3:
+                    default_date = st.date_input("Default Cloud Activation Date", value=datetime.today())
+                submitted_import = st.form_submit_button("Import Robots", use_container_width=True)
+
+            if submitted_import:
+                if uploaded_file is None:
+                    st.error("❌ Please choose a file to import")
                 else:
                     try:
-                        activation_date = datetime.combine(cloud_date, datetime.min.time())
-                        cloud_expiry = (activation_date + timedelta(days=int(cloud_period) * 30)).strftime("%Y-%m-%d")
-                    except:
-                        cloud_expiry = ""
-
-                    success = append_row_by_header("Robot Log", {
-                        "Robot Model": robot_model,
-                        "Serial Number": serial_number,
-                        "MAC Address": mac_address,
-                        "Cloud Activation Period (Months)": str(cloud_period),
-                        "Cloud Activation Date": cloud_date.strftime("%Y-%m-%d"),
-                        "Cloud Expiry": cloud_expiry,
-                        "Cloud Store Group": cloud_store_group,
-                        "Maintenance Plan": "",
-                        "Outlet using": "",
-                        "Status": "Idle"
-                    })
-                    if success:
-                        st.success(f"✅ Robot '{robot_model}' added successfully!")
-                        st.cache_data.clear()
-                        st.balloons()
-                    else:
-                        st.error("❌ Failed to add robot")
+                        with track_api_requests("Import Robots"):
+                            imported, rejected = import_robots(
+                                iter_import_rows(uploaded_file), default_model,
+                                default_period, default_date, available_types
+                            )
+                    except ValueError as e:
+                        # Rows are only appended once the whole file was read, so nothing was saved
+                        st.error(f"❌ {e}. Nothing was imported.")
+                        imported, rejected = None, []
+                    if imported:
+                        st.success(f"✅ Imported {imported} robot(s)")
+                    if rejected:
+                        st.warning(f"⚠️ {len(rejected)} row(s) were rejected")
+                        rejected_df = pd.DataFrame(rejected)
+                        st.dataframe(rejected_df, use_container_width=True, hide_index=True)
+                        st.download_button(label="📥 Download rejected rows", data=rejected_df.to_csv(index=False).encode('utf-8'),
+                            file_name=f"rejected_robots_{datetime.now().strftime('%Y%m%d')}.csv", mime="text/csv")
+                    elif imported == 0:
+                        st.info("No robots found in the file")
 
 # ================= DEPLOY ROBOT =================
 elif menu == "Deploy Robot":
@@ -938,50 +2864,24 @@ elif menu == "Deploy Robot":
                 if not all([client_name, location, cloud_store_group]) or len(selected_robots) == 0:
                     st.error("❌ Please fill in all required fields and select at least one robot")
                 else:
-                    all_ok = True
-                    deployed_list = []
-
-                    for sel in selected_robots:
-                        robot_serial = sel.split(" - ")[0]
-                        robot = find_robot(robot_serial)
-
-                        if not robot:
-                            st.error(f"❌ Robot {robot_serial} not found")
-                            all_ok = False
-                            continue
-
-                        if normalize(robot["Status"]) != "idle":
-                            st.error(f"❌ Robot {robot_serial} is not idle (Current: {robot['Status']})")
-                            all_ok = False
-                            continue
-
-                        # Update robot status + maintenance plan + cloud store group
-                        update_robot(robot_serial, {
-                            "Status": "Active",
-                            "Outlet using": client_name,
-                            "Maintenance Plan": maintenance_package,
-                            "Cloud Store Group": cloud_store_group
-                        })
-
-                        # Add one row per robot in Client Log
-                        append_row_by_header("Client Log", {
-                            "Client Name": client_name,
-                            "Location": location,
-                            "Date of deployment": datetime.today().strftime("%Y-%m-%d"),
-                            "Deplyoment Type": "Deployment",
-                            "Deployment Status": "Active",
-                            "Maintance Package": maintenance_package,
-                            "Cloud Store Group": cloud_store_group,
-                            "Robot Deployed": robot.get("Robot Model", ""),
-                            "Serial Number": robot_serial,
-                            "MAC Address": robot.get("MAC Address", "")
-                        })
-
-                        deployed_list.append(f"{robot_serial} ({robot.get('Robot Model', '')})")
+                    # Validate, update Robot Log and append Client Log for all robots at once
+                    with track_api_requests("Deploy Robot"):
+                        results = deploy_robots(
+                            [sel.split(" - ")[0] for sel in selected_robots],
+                            client_name, location, cloud_store_group, maintenance_package
+                        )
+
+                    for result in results:
+                        if result["error"]:
+                            st.error(f"❌ {result['error']}")
+                    all_ok = all(result["error"] is None for result in results)
+                    deployed_list = [
+                        f"{result['serial']} ({result['robot'].get('Robot Model', '')})"
+                        for result in results if result["error"] is None
+                    ]
 
                     if all_ok and deployed_list:
                         st.success(f"✅ Deployed {len(deployed_list)} robot(s) to {client_name}:\n" + "\n".join(f"  • {d}" for d in deployed_list))
-                        st.cache_data.clear()
                         st.balloons()
                     elif deployed_list:
                         st.warning(f"⚠️ Deployed {len(deployed_list)} robot(s) but some failed. Check errors above.")
@@ -1016,21 +2916,21 @@ elif menu == "Add Maintenance":
                     if not robot:
                         st.error("❌ Robot not found")
                     else:
-                        success = append_row_by_header("Maintenance and troubleshooting log", {
-                            "Date of Issue": datetime.today().strftime("%Y-%m-%d"),
-                            "Client Name": robot.get("Outlet using", ""),
-                            "Location of Robot": "",
-                            "Robot Model": robot.get("Robot Model", ""),
-                            "Serial Number": robot_serial,
-                            "MAC Address": robot.get("MAC Address", ""),
-                            "Problem details": problem,
-                            "Solution": solution,
-                            "Remarks": remarks,
-                            "Status": "Open"
-                        })
+                        with track_api_requests("Add Maintenance"):
+                            success = append_row_by_header("Maintenance and troubleshooting log", {
+                                "Date of Issue": datetime.today().strftime("%Y-%m-%d"),
+                                "Client Name": robot.get("Outlet using", ""),
+                                "Location of Robot": "",
+                                "Robot Model": robot.get("Robot Model", ""),
+                                "Serial Number": robot_serial,
+                                "MAC Address": robot.get("MAC Address", ""),
+                                "Problem details": problem,
+                                "Solution": solution,
+                                "Remarks": remarks,
+                                "Status": "Open"
+                            })
                         if success:
                             st.success("✅ Maintenance record added successfully!")
-                            st.cache_data.clear()
                             st.balloons()
                         else:
                             st.error("❌ Failed to add maintenance record")
@@ -1038,13 +2938,11 @@ elif menu == "Add Maintenance":
 # ================= VIEW ROBOT LOG =================
 elif menu == "View Robot Log":
     st.header("📋 Robot Log")
-    robots = fetch_all_cached("Robot Log")
+    df = sheet_frame("Robot Log")
 
-    if not robots:
+    if df.empty:
         st.info("No robots found")
     else:
-        df = pd.DataFrame(robots)
-
         col1, col2, col3 = st.columns(3)
         with col1:
             status_filter = st.multiselect("Filter by Status",
@@ -1057,25 +2955,45 @@ elif menu == "View Robot Log":
         with col3:
             search = st.text_input("Search Serial Number", "")
 
-        filtered_df = df.copy()
-        if "Status" in filtered_df.columns and status_filter:
-            filtered_df = filtered_df[filtered_df["Status"].isin(status_filter)]
-        if "Robot Model" in filtered_df.columns and model_filter:
-            filtered_df = filtered_df[filtered_df["Robot Model"].isin(model_filter)]
-        if search and "Serial Number" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["Serial Number"].str.contains(search, case=False, na=False)]
+        isin = [(col, values) for col, values in (("Status", status_filter), ("Robot Model", model_filter)) if values]
+        filtered_df = filter_frame("Robot Log", df, isin, ("Serial Number",), search)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_column = st.selectbox("Sort by", ["Sheet order"] + df.columns.tolist(), key="robot_log_sort")
+        with col2:
+            sort_descending = st.toggle("Descending", key="robot_log_descending")
+        with col3:
+            page_size = st.selectbox("Rows per page", ROBOT_LOG_PAGE_SIZES, key="robot_log_page_size")
+
+        filtered_df = sort_frame(filtered_df, None if sort_column == "Sheet order" else sort_column, sort_descending)
+        page_df, page, page_count = frame_page(filtered_df, "robot_log_page", page_size)
 
-        st.dataframe(filtered_df, use_container_width=True, height=400)
+        st.dataframe(page_df, use_container_width=True, height=400, column_config=frame_column_config(page_df))
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            first_row = (page - 1) * page_size + 1 if len(filtered_df) else 0
+            st.caption(f"Showing {first_row}–{first_row + len(page_df) - 1 if len(page_df) else 0} of {len(filtered_df)} robot(s)")
+        with col2:
+            st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="robot_log_page")
 
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="📥 Download as CSV", data=csv,
-            file_name=f"robot_log_{datetime.now().strftime('%Y%m%d')}.csv", mime="text/csv")
+        export_controls("Robot Log", filtered_df,
+            (tuple(status_filter), tuple(model_filter), search, sort_column, sort_descending), "robot_log")
 
         st.markdown("---")
         st.subheader("✏️ Edit or Delete Robot")
 
-        robot_options = [f"{r['Serial Number']} - {r['Robot Model']}" for r in robots]
-        selected_robot = st.selectbox("Select Robot to Edit/Delete", [""] + robot_options, key="edit_robot_select")
+        robot_query = st.text_input("Find Robot to Edit/Delete", placeholder="Type part of a serial number", key="edit_robot_query")
+        selected_robot = ""
+        if robot_query.strip():
+            robot_options = match_robots(df, robot_query)
+            if robot_options:
+                selected_robot = st.selectbox(
+                    f"Matching robots (first {ROBOT_PICKER_MATCHES} shown)" if len(robot_options) == ROBOT_PICKER_MATCHES else "Matching robots",
+                    [""] + robot_options, key="edit_robot_select"
+                )
+            else:
+                st.info("No robot matches that serial number")
 
         if selected_robot:
             robot_serial = selected_robot.split(" - ")[0]
@@ -1104,17 +3022,17 @@ elif menu == "View Robot Log":
                             if new_mac != robot.get("MAC Address", "") and check_mac_exists(new_mac, robot_serial):
                                 st.error("❌ MAC Address already exists!")
                             else:
-                                success = update_robot(robot_serial, {
-                                    "Robot Model": new_model,
-                                    "MAC Address": new_mac,
-                                    "Cloud Store Group": new_cloud_store,
-                                    "Status": new_status,
-                                    "Outlet using": new_outlet,
-                                    "Maintenance Plan": new_maintenance_plan
-                                })
+                                with track_api_requests("Edit Robot"):
+                                    success = update_robot(robot_serial, {
+                                        "Robot Model": new_model,
+                                        "MAC Address": new_mac,
+                                        "Cloud Store Group": new_cloud_store,
+                                        "Status": new_status,
+                                        "Outlet using": new_outlet,
+                                        "Maintenance Plan": new_maintenance_plan
+                                    })
                                 if success:
                                     st.success("✅ Robot updated successfully!")
-                                    st.cache_data.clear()
                                     st.rerun()
                                 else:
                                     st.error("❌ Failed to update robot")
@@ -1136,17 +3054,17 @@ elif menu == "View Robot Log":
                     confirm_delete = st.text_input("Type 'DELETE' to confirm:", key="confirm_robot_delete")
                     if st.button("🗑️ Delete Robot", type="primary", use_container_width=True):
                         if confirm_delete == "DELETE":
-                            # If linked to client log, set those to Inactive first
-                            if linked_clients:
-                                set_client_inactive_by_serial(robot_serial)
-                            # Now delete the robot row
-                            success = delete_robot_row(robot_serial)
+                            with track_api_requests("Delete Robot"):
+                                # If linked to client log, set those to Inactive first
+                                if linked_clients:
+                                    set_client_inactive_by_serial(robot_serial)
+                                # Now delete the robot row
+                                success = delete_robot_row(robot_serial)
                             if success:
                                 if linked_clients:
                                     st.success(f"✅ Robot deleted. {len(linked_clients)} client deployment(s) set to Inactive.")
                                 else:
                                     st.success("✅ Robot deleted successfully!")
-                                    st.cache_data.clear()
                                     st.rerun()
                             else:
                                 st.error("❌ Failed to delete robot")
@@ -1161,7 +3079,7 @@ elif menu == "View Client Log":
     if not clients:
         st.info("No clients found")
     else:
-        df = pd.DataFrame(clients)
+        df = sheet_frame("Client Log")
 
         col1, col2 = st.columns(2)
         with col1:
@@ -1169,19 +3087,15 @@ elif menu == "View Client Log":
                 status_filter = st.multiselect("Filter by Status",
                     options=df["Deployment Status"].unique().tolist(),
                     default=df["Deployment Status"].unique().tolist())
-                filtered_df = df[df["Deployment Status"].isin(status_filter)]
-            else:
-                filtered_df = df.copy()
         with col2:
             search = st.text_input("Search Client Name", "")
-            if search and "Client Name" in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df["Client Name"].str.contains(search, case=False, na=False)]
+        filtered_df = filter_frame("Client Log", df,
+            [("Deployment Status", status_filter)] if "Deployment Status" in df.columns else [], ("Client Name",), search)
 
-        st.dataframe(filtered_df, use_container_width=True, height=400)
+        st.dataframe(filtered_df, use_container_width=True, height=400, column_config=frame_column_config(filtered_df))
 
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="📥 Download as CSV", data=csv,
-            file_name=f"client_log_{datetime.now().strftime('%Y%m%d')}.csv", mime="text/csv")
+        export_controls("Client Log", filtered_df,
+            (tuple(status_filter) if "Deployment Status" in df.columns else (), search), "client_log")
 
         # -------- RETRIEVE ROBOT SECTION --------
         st.markdown("---")
@@ -1211,20 +3125,23 @@ elif menu == "View Client Log":
                 st.write(f"**Robot:** {retrieve_client.get('Robot Deployed', '')} | SN: {retrieve_serial}")
 
                 if st.button("🔄 Retrieve Robot", type="primary", use_container_width=True):
-                    # Set client deployment to Inactive
-                    client_ok = update_client_row(retrieve_row_idx, {
-                        "Deployment Status": "Inactive"
-                    })
-                    # Set robot status back to Idle and clear outlet
-                    robot_ok = update_robot(retrieve_serial, {
-                        "Status": "Idle",
-                        "Outlet using": ""
-                    })
+                    with track_api_requests("Retrieve Robot"):
+                        # Set client deployment to Inactive
+                        client_ok = update_client_row(retrieve_row_idx, retrieve_client, {
+                            "Deployment Status": "Inactive"
+                        })
+                        # Set robot status back to Idle and clear outlet, unless the deployment
+                        # changed under us and was left alone
+                        robot_ok = client_ok and update_robot(retrieve_serial, {
+                            "Status": "Idle",
+                            "Outlet using": ""
+                        })
 
                     if client_ok and robot_ok:
                         st.success(f"✅ Robot {retrieve_serial} retrieved successfully! Deployment set to Inactive, robot set to Idle.")
-                        st.cache_data.clear()
                         st.rerun()
+                    elif not client_ok:
+                        st.error("❌ This deployment was changed by someone else; refresh and try again.")
                     else:
                         st.error("❌ Failed to retrieve robot. Check logs.")
 
@@ -1268,32 +3185,32 @@ elif menu == "View Client Log":
                     submit_edit = st.form_submit_button("💾 Save Changes", use_container_width=True)
 
                     if submit_edit:
-                        # Update client log
-                        client_ok = update_client_row(row_idx, {
-                            "Client Name": new_client_name,
-                            "Location": new_location,
-                            "Deployment Status": new_deployment_status,
-                            "Maintance Package": new_maintenance_package,
-                            "Deplyoment Type": new_deployment_type,
-                            "Cloud Store Group": new_cloud_store_group
-                        })
-
-                        # Sync Maintenance Plan to Robot Log
-                        client_serial = str(client.get("Serial Number", ""))
-                        robot_ok = True
-                        if client_serial:
-                            robot_ok = update_robot(client_serial, {
-                                "Maintenance Plan": new_maintenance_package
+                        with track_api_requests("Edit Client Deployment"):
+                            # Update client log
+                            client_ok = update_client_row(row_idx, client, {
+                                "Client Name": new_client_name,
+                                "Location": new_location,
+                                "Deployment Status": new_deployment_status,
+                                "Maintance Package": new_maintenance_package,
+                                "Deplyoment Type": new_deployment_type,
+                                "Cloud Store Group": new_cloud_store_group
                             })
 
+                            # Sync Maintenance Plan to Robot Log
+                            client_serial = str(client.get("Serial Number", ""))
+                            robot_ok = True
+                            if client_serial:
+                                robot_ok = update_robot(client_serial, {
+                                    "Maintenance Plan": new_maintenance_package
+                                })
+
                         if client_ok and robot_ok:
                             st.success("✅ Client deployment updated! Maintenance Plan synced to Robot Log.")
-                            st.cache_data.clear()
                             st.rerun()
                         elif client_ok:
                             st.warning("⚠️ Client updated but failed to sync Maintenance Plan to Robot Log.")
                         else:
-                            st.error("❌ Failed to update client deployment")
+                            st.error("❌ Failed to update client deployment. It may have been changed by someone else; refresh and try again.")
 
             with tab2:
                 st.warning("⚠️ **Warning:** This action cannot be undone!")
@@ -1305,13 +3222,13 @@ elif menu == "View Client Log":
                 confirm_delete = st.text_input("Type 'DELETE' to confirm:", key="confirm_client_delete")
                 if st.button("🗑️ Delete Client Deployment", type="primary", use_container_width=True):
                     if confirm_delete == "DELETE":
-                        success = delete_client_row(row_idx)
+                        with track_api_requests("Delete Client Deployment"):
+                            success = delete_client_row(row_idx, client)
                         if success:
                             st.success("✅ Client deployment deleted successfully!")
-                            st.cache_data.clear()
                             st.rerun()
                         else:
-                            st.error("❌ Failed to delete client deployment")
+                            st.error("❌ Failed to delete client deployment. It may have been changed by someone else; refresh and try again.")
                     else:
                         st.error("❌ Please type 'DELETE' to confirm")
 
@@ -1323,7 +3240,7 @@ elif menu == "View Maintenance Log":
     if not maintenance:
         st.info("No maintenance records found")
     else:
-        df = pd.DataFrame(maintenance)
+        df = sheet_frame("Maintenance and troubleshooting log")
 
         col1, col2 = st.columns(2)
         with col1:
@@ -1331,23 +3248,104 @@ elif menu == "View Maintenance Log":
                 status_filter = st.multiselect("Filter by Status",
                     options=df["Status"].unique().tolist(),
                     default=df["Status"].unique().tolist())
-                df = df[df["Status"].isin(status_filter)]
+                df = filter_frame("Maintenance and troubleshooting log", df, [("Status", status_filter)])
         with col2:
-            search = st.text_input("Search Serial Number or Client", "")
-            if search:
-                mask = pd.Series([False] * len(df))
-                if "Serial Number" in df.columns:
-                    mask |= df["Serial Number"].astype(str).str.contains(search, case=False, na=False)
-                if "Client Name" in df.columns:
-                    mask |= df["Client Name"].astype(str).str.contains(search, case=False, na=False)
-                df = df[mask]
-
-        st.dataframe(df, use_container_width=True, height=400)
-
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="📥 Download as CSV", data=csv,
-            file_name=f"maintenance_log_{datetime.now().strftime('%Y%m%d')}.csv", mime="text/csv")
+            search = st.text_input("Search", "", placeholder="Serial, client, problem, solution, remarks...",
+                help="Rows must contain every word, in any column; part of a serial or MAC address is enough. Best matches are listed first")
+            if tokenize(search):
+                # Ranked record positions; the frame's index is the same record position
+                ranked = search_sheet("Maintenance and troubleshooting log", search)
+                df = df.loc[ranked.intersection(df.index, sort=False)]
+
+        st.dataframe(df, use_container_width=True, height=400, column_config=frame_column_config(df))
+
+        export_controls("Maintenance and troubleshooting log", df,
+            (tuple(status_filter) if "Status" in df.columns else (), search), "maintenance_log")
+
+# ================= DIAGNOSTICS =================
+elif menu == "Diagnostics":
+    st.header("🩺 Diagnostics")
+    calls = get_api_log().frame()
+    now = time.time()
+
+    st.subheader("Quota")
+    last_minute = calls[calls["time"] > now - 60]
+    headroom = get_request_scheduler().headroom()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Reads (last 60s)", f"{int((last_minute['method'] == 'GET').sum())}/{headroom['read'][1]}")
+    with col2:
+        st.metric("Writes (last 60s)", f"{int((last_minute['method'] != 'GET').sum())}/{headroom['write'][1]}")
+    with col3:
+        st.metric("429 responses", int((calls["status"] == 429).sum()))
+    with col4:
+        st.metric("Queued for quota", get_request_scheduler().deferred,
+            help=f"{get_request_scheduler().waited:.1f}s spent waiting in total")
+
+    st.subheader("Cache hit rates")
+    sheet_stats = get_sheet_cache().stats
+    filter_stats = get_filter_memo().stats
+    sheet_lookups = sheet_stats["hits"] + sheet_stats["stale_hits"] + sheet_stats["fetches"] + sheet_stats["coalesced"]
+    filter_lookups = filter_stats["hits"] + filter_stats["misses"] + filter_stats["refined"]
+    st.dataframe(pd.DataFrame([
+        {"Cache": "Sheet data", "Lookups": sheet_lookups,
+         "Hit rate": f"{(sheet_stats['hits'] + sheet_stats['stale_hits']) / sheet_lookups:.0%}" if sheet_lookups else "–",
+         "Details": f"{sheet_stats['stale_hits']} served stale, {sheet_stats['fetches']} fetches, "
+                    f"{sheet_stats['coalesced']} coalesced, {sheet_stats['unchanged']} unchanged by probe"},
+        {"Cache": "Filter results", "Lookups": filter_lookups,
+         "Hit rate": f"{filter_stats['hits'] / filter_lookups:.0%}" if filter_lookups else "–",
+         "Details": f"{filter_stats['refined']} refined from a shorter search"},
+    ]), use_container_width=True, hide_index=True)
+
+    if calls.empty:
+        st.info("No API calls recorded yet")
+    else:
+        calls["429"] = calls["status"] == 429
+        summary = {"Calls": ("operation", "size"), "Total ms": ("latency_ms", "sum"), "Avg ms": ("latency_ms", "mean"),
+                   "Sent bytes": ("request_bytes", "sum"), "Received bytes": ("response_bytes", "sum"), "429s": ("429", "sum")}
+
+        st.subheader("By page and action")
+        by_action = calls.groupby(["page", "action"]).agg(**summary).reset_index()
+        st.dataframe(by_action.sort_values("Total ms", ascending=False).round(1), use_container_width=True, hide_index=True)
+
+        st.subheader("Recent reruns")
+        by_rerun = calls.groupby(["rerun", "page"]).agg(started=("time", "min"), **summary).reset_index()
+        by_rerun["started"] = pd.to_datetime(by_rerun["started"], unit="s").dt.strftime("%H:%M:%S")
+        st.dataframe(by_rerun.sort_values("rerun", ascending=False).head(20).round(1), use_container_width=True, hide_index=True)
+
+        st.subheader("Slowest operations")
+        slowest = calls.nlargest(10, "latency_ms").copy()
+        slowest["time"] = pd.to_datetime(slowest["time"], unit="s").dt.strftime("%H:%M:%S")
+        st.dataframe(slowest.drop(columns=["429"]).round(1), use_container_width=True, hide_index=True)
+
+    if st.button("🧹 Clear call log"):
+        get_api_log().clear()
+        st.rerun()
 
 # ================= FOOTER =================
+profiler.mark("footer")
+as_of = get_sheet_cache().as_of()
+if as_of is not None:
+    refreshing = " (refreshing in the background)" if get_sheet_cache().in_flight else ""
+    data_as_of.caption(
+        f"💡 Data as of {datetime.fromtimestamp(as_of).strftime('%H:%M:%S')}{refreshing}. "
+        "Click 'Refresh Data' to force update."
+    )
+
 st.sidebar.markdown("---")
-st.sidebar.info("💡 Use the navigation menu to access different features")
\ No newline at end of file
+if "last_save" in st.session_state:
+    last_save = st.session_state.last_save
+    st.sidebar.caption(f"📡 Last save ({last_save['action']}) used {last_save['requests']} API request(s)")
+headroom = get_request_scheduler().headroom()
+st.sidebar.caption(
+    f"🚦 API headroom this minute: {headroom['read'][0]}/{headroom['read'][1]} reads, "
+    f"{headroom['write'][0]}/{headroom['write'][1]} writes"
+)
+cache_stats = get_sheet_cache().stats
+if cache_stats["coalesced"]:
+    st.sidebar.caption(f"🔀 {cache_stats['coalesced']} concurrent sheet load(s) shared {cache_stats['fetches']} fetch(es)")
+if get_request_scheduler().deferred:
+    st.sidebar.caption(f"⏳ {get_request_scheduler().deferred} request(s) queued so far to stay within quota")
+snapshot_controls()
+st.sidebar.info("💡 Use the navigation menu to access different features")
+profiler.finish()
\ No newline at end of file